@@ -0,0 +1,28 @@
+"""Add alert dedup index
+
+Revision ID: 0c3e5b7a9d21
+Revises: be92f52d4026
+Create Date: 2026-10-16 09:12:41.402137
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0c3e5b7a9d21'
+down_revision: Union[str, Sequence[str], None] = 'be92f52d4026'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_alert_fridge_item_type_status', 'alerts', ['fridge_id', 'inventory_item_id', 'type', 'status'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_alert_fridge_item_type_status', table_name='alerts')
@@ -0,0 +1,75 @@
+"""Add fridge daily consumption summary
+
+Revision ID: 3b7d9e1f4a62
+Revises: 8e4a1f2c7b90
+Create Date: 2026-10-16 14:02:51.663410
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b7d9e1f4a62'
+down_revision: Union[str, Sequence[str], None] = '8e4a1f2c7b90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('fridge_daily_consumption',
+    sa.Column('fridge_id', sa.Integer(), nullable=False),
+    sa.Column('product_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('unit', sa.String(), nullable=True),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('quantity', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['fridge_id'], ['fridges.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['product_id'], ['products.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('fridge_id', 'product_id', 'day')
+    )
+
+    op.execute("""
+        CREATE OR REPLACE FUNCTION record_daily_consumption() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO fridge_daily_consumption (fridge_id, product_id, day, unit, count, quantity)
+            SELECT NEW.fridge_id, i.product_id, NEW.created_at::date, i.unit, 1,
+                   CASE WHEN json_typeof(NEW.payload -> 'quantity_consumed') = 'number'
+                        THEN (NEW.payload ->> 'quantity_consumed')::float ELSE 0 END
+            FROM inventory_items i
+            WHERE i.id = NEW.inventory_item_id
+            ON CONFLICT (fridge_id, product_id, day) DO UPDATE
+            SET count = fridge_daily_consumption.count + 1,
+                quantity = fridge_daily_consumption.quantity + EXCLUDED.quantity,
+                unit = EXCLUDED.unit;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_events_daily_consumption
+        AFTER INSERT ON events
+        FOR EACH ROW WHEN (NEW.type = 'ITEM_CONSUMED')
+        EXECUTE FUNCTION record_daily_consumption()
+    """)
+
+    op.execute("""
+        INSERT INTO fridge_daily_consumption (fridge_id, product_id, day, unit, count, quantity)
+        SELECT e.fridge_id, i.product_id, e.created_at::date, MIN(i.unit), COUNT(*),
+               SUM(CASE WHEN json_typeof(e.payload -> 'quantity_consumed') = 'number'
+                        THEN (e.payload ->> 'quantity_consumed')::float ELSE 0 END)
+        FROM events e
+        JOIN inventory_items i ON i.id = e.inventory_item_id
+        WHERE e.type = 'ITEM_CONSUMED'
+        GROUP BY e.fridge_id, i.product_id, e.created_at::date
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS trg_events_daily_consumption ON events")
+    op.execute("DROP FUNCTION IF EXISTS record_daily_consumption()")
+    op.drop_table('fridge_daily_consumption')
@@ -0,0 +1,28 @@
+"""Add unpaired pairing code index
+
+Revision ID: 5d81f0c4e6a2
+Revises: 0c3e5b7a9d21
+Create Date: 2026-10-16 10:04:18.551930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d81f0c4e6a2'
+down_revision: Union[str, Sequence[str], None] = '0c3e5b7a9d21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_fridge_pairing_code_unpaired', 'fridges', ['pairing_code', 'created_at'], unique=False, postgresql_where=sa.text('is_paired = false'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_fridge_pairing_code_unpaired', table_name='fridges', postgresql_where=sa.text('is_paired = false'))
@@ -0,0 +1,34 @@
+"""Add fridge config default
+
+Revision ID: 6f2c8d4b1e37
+Revises: 3b7d9e1f4a62
+Create Date: 2026-10-16 23:58:12.407315
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6f2c8d4b1e37'
+down_revision: Union[str, Sequence[str], None] = '3b7d9e1f4a62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+DEFAULT_CONFIG = '{"expiry_warning_days": 3, "lost_item_threshold_hours": 72, "low_stock_threshold": 2.0}'
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.alter_column('fridges', 'config', server_default=sa.text(f"'{DEFAULT_CONFIG}'"))
+    op.execute(
+        f"UPDATE fridges SET config = '{DEFAULT_CONFIG}' "
+        "WHERE config IS NULL OR config::text = '{}'"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.alter_column('fridges', 'config', server_default=None)
@@ -0,0 +1,30 @@
+"""Add event fridge created type index
+
+Revision ID: 8e4a1f2c7b90
+Revises: 5d81f0c4e6a2
+Create Date: 2026-10-16 11:36:05.218764
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e4a1f2c7b90'
+down_revision: Union[str, Sequence[str], None] = '5d81f0c4e6a2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_event_fridge_created_type', 'events', ['fridge_id', sa.text('created_at DESC'), 'type'], unique=False)
+    op.drop_index('ix_event_fridge_created', table_name='events')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index('ix_event_fridge_created', 'events', ['fridge_id', 'created_at'], unique=False)
+    op.drop_index('ix_event_fridge_created_type', table_name='events')
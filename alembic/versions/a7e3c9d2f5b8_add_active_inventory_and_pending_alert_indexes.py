@@ -0,0 +1,30 @@
+"""Add active inventory and pending alert indexes
+
+Revision ID: a7e3c9d2f5b8
+Revises: 6f2c8d4b1e37
+Create Date: 2026-10-17 00:21:47.630915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7e3c9d2f5b8'
+down_revision: Union[str, Sequence[str], None] = '6f2c8d4b1e37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_inventory_active_fridge_expiry', 'inventory_items', ['fridge_id', 'expiry_date'], unique=False, postgresql_where=sa.text('quantity > 0'))
+    op.create_index('ix_alert_item_pending', 'alerts', ['inventory_item_id'], unique=False, postgresql_where=sa.text("status = 'pending'"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_alert_item_pending', table_name='alerts', postgresql_where=sa.text("status = 'pending'"))
+    op.drop_index('ix_inventory_active_fridge_expiry', table_name='inventory_items', postgresql_where=sa.text('quantity > 0'))
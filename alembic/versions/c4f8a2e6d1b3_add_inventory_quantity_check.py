@@ -0,0 +1,29 @@
+"""Add non-negative inventory quantity check
+
+Revision ID: c4f8a2e6d1b3
+Revises: a7e3c9d2f5b8
+Create Date: 2026-10-17 01:12:05.284417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4f8a2e6d1b3'
+down_revision: Union[str, Sequence[str], None] = 'a7e3c9d2f5b8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(sa.text('UPDATE inventory_items SET quantity = 0 WHERE quantity < 0'))
+    op.create_check_constraint('ck_inventory_quantity_nonneg', 'inventory_items', 'quantity >= 0')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('ck_inventory_quantity_nonneg', 'inventory_items', type_='check')
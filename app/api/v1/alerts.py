@@ -1,7 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List
 from datetime import datetime
+import orjson
 
 from app.core.database import get_db
 from app.core.dependencies import get_fridge_access_hybrid
@@ -28,6 +30,35 @@ def list_alerts(
     return query.order_by(Alert.created_at.desc()).all()
 
 
+@router.get("/stream")
+def stream_alerts(
+    fridge: Fridge = Depends(get_fridge_access_hybrid),
+    db: Session = Depends(get_db),
+    status: str = None,
+):
+    """Liste les alertes en NDJSON (une alerte par ligne), par lots de 200"""
+    query = db.query(
+        Alert.id,
+        Alert.fridge_id,
+        Alert.inventory_item_id,
+        Alert.type,
+        Alert.message,
+        Alert.status,
+        Alert.created_at,
+    ).filter(Alert.fridge_id == fridge.id)
+
+    if status:
+        query = query.filter(Alert.status == status).order_by(Alert.resolved_at.desc())
+    else:
+        query = query.order_by(Alert.created_at.desc())
+
+    def generate():
+        for row in query.yield_per(200):
+            yield orjson.dumps(row._asdict()) + b"\n"
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
 @router.put("/{alert_id}", response_model=AlertResponse)
 def update_alert_status(
     alert_id: int,
@@ -58,6 +89,9 @@ def trigger_alert_check(
     fridge: Fridge = Depends(get_fridge_access_hybrid), db: Session = Depends(get_db)
 ):
     alert_service = AlertService(db)
-    alert_service.check_and_create_alerts(fridge_id=fridge.id)
+    # Push et emails envoyés par les workers de notification, hors de la requête
+    alert_service.check_and_create_alerts(
+        fridge_id=fridge.id, notify_in_background=True
+    )
 
     return {"message": "Alert check completed"}
@@ -25,6 +25,12 @@ def list_events(
     end_date: Optional[datetime] = Query(None, description="Date de fin (ISO 8601)"),
     page: int = Query(1, ge=1, description="Numéro de page"),
     page_size: int = Query(50, ge=1, le=100, description="Nombre d'éléments par page"),
+    before: Optional[datetime] = Query(
+        None, description="Curseur : événements antérieurs à cette date (ignore page)"
+    ),
+    before_id: Optional[int] = Query(
+        None, description="Curseur : départage les événements de même date"
+    ),
 ):
     event_service = EventService(db)
 
@@ -37,6 +43,8 @@ def list_events(
         offset=offset,
         start_date=start_date,
         end_date=end_date,
+        before=before,
+        before_id=before_id,
     )
 
     query = db.query(Event).filter(Event.fridge_id == fridge.id)
@@ -55,6 +63,8 @@ def list_events(
         "page": page,
         "page_size": page_size,
         "total_pages": (total + page_size - 1) // page_size,
+        "next_before": events[-1].created_at if len(events) == page_size else None,
+        "next_before_id": events[-1].id if len(events) == page_size else None,
         "filters": {
             "event_type": event_type,
             "start_date": start_date.isoformat() if start_date else None,
@@ -73,6 +83,16 @@ def get_event_statistics(
     return event_service.get_event_statistics(fridge.id, days)
 
 
+@router.get("/statistics/utilization", response_model=Dict[str, Any])
+def get_utilization_statistics(
+    fridge: Fridge = Depends(get_user_fridge),
+    db: Session = Depends(get_db),
+    days: int = Query(30, ge=1, le=365, description="Nombre de jours d'historique"),
+):
+    event_service = EventService(db)
+    return event_service.get_utilization(fridge.id, days)
+
+
 @router.get("/items/{item_id}/history", response_model=List[EventResponse])
 def get_item_event_history(
     item_id: int = Path(..., description="ID de l'item d'inventaire"),
@@ -182,24 +202,11 @@ def get_statistics_by_event_type(
 
     cutoff_date = datetime.utcnow() - timedelta(days=days)
 
-    events = event_service.get_events(
-        fridge_id=fridge.id,
-        event_type=event_type,
-        start_date=cutoff_date,
-        limit=1000,
-    )
-
-    total_count = len(events)
+    rows = event_service.get_event_type_timeline(fridge.id, event_type, cutoff_date)
 
-    events_by_day = {}
-    for event in events:
-        day = event.created_at.date().isoformat()
-        events_by_day[day] = events_by_day.get(day, 0) + 1
+    total_count = sum(row.count for row in rows)
 
-    timeline = sorted(
-        [{"date": date, "count": count} for date, count in events_by_day.items()],
-        key=lambda x: x["date"],
-    )
+    timeline = [{"date": row.day.isoformat(), "count": row.count} for row in rows]
 
     avg_per_day = total_count / days if days > 0 else 0
 
@@ -209,6 +216,6 @@ def get_statistics_by_event_type(
         "total_count": total_count,
         "average_per_day": round(avg_per_day, 2),
         "timeline": timeline,
-        "first_event": events[-1].created_at.isoformat() if events else None,
-        "last_event": events[0].created_at.isoformat() if events else None,
+        "first_event": rows[0].first_at.isoformat() if rows else None,
+        "last_event": rows[-1].last_at.isoformat() if rows else None,
     }
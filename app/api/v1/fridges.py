@@ -1,10 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from datetime import datetime
+import asyncio
 
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import SessionLocal, get_db
 from app.core.dependencies import get_current_user
+from app.core.kiosk_events import publish_kiosk_event, subscribe_kiosk
 from app.models.user import User
 from app.services.fridge_service import FridgeService
 from app.services.notification_service import NotificationService
@@ -22,6 +26,9 @@ from app.schemas.fridge import (
 
 router = APIRouter(prefix="/fridges", tags=["Fridges"])
 
+# Relecture périodique du statut : l'événement de pairing n'est qu'une voie rapide
+KIOSK_STATUS_RECHECK_SECONDS = 5
+
 
 @router.post("/kiosk/init", response_model=KioskInitResponse)
 def init_kiosk(
@@ -41,7 +48,17 @@ def get_kiosk_by_device_id(
     device_id: str,
     db: Session = Depends(get_db),
 ):
-    fridge = db.query(Fridge).filter(Fridge.device_id == device_id).first()
+    fridge = (
+        db.query(
+            Fridge.kiosk_id,
+            Fridge.is_paired,
+            Fridge.id,
+            Fridge.name,
+            Fridge.pairing_code,
+        )
+        .filter(Fridge.device_id == device_id)
+        .first()
+    )
 
     if not fridge:
         raise HTTPException(status_code=404, detail="Device not found")
@@ -69,20 +86,94 @@ def kiosk_heartbeat(
     }
 
 
+def _load_kiosk_status(kiosk_id: str, use_cache: bool = True) -> Optional[Dict]:
+    # Session courte : l'attente d'un pairing ne doit pas garder une connexion
+    db = SessionLocal()
+    try:
+        return FridgeService(db).get_fridge_status(kiosk_id, use_cache=use_cache)
+    finally:
+        db.close()
+
+
+async def _wait_for_pairing(
+    kiosk_id: str, events: asyncio.Queue, timeout: float
+) -> Optional[Dict]:
+    """Statut du kiosk une fois pairé, ou None si le délai expire"""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+
+    while (remaining := deadline - loop.time()) > 0:
+        try:
+            await asyncio.wait_for(
+                events.get(), timeout=min(remaining, KIOSK_STATUS_RECHECK_SECONDS)
+            )
+        except asyncio.TimeoutError:
+            pass
+
+        status = await run_in_threadpool(_load_kiosk_status, kiosk_id, False)
+        if status and status["is_paired"]:
+            return status
+
+    return None
+
+
 @router.get("/kiosk/{kiosk_id}/status", response_model=KioskStatusResponse)
-def get_kiosk_status(
+async def get_kiosk_status(
     kiosk_id: str,
-    db: Session = Depends(get_db),
+    wait: int = Query(
+        0, ge=0, le=25, description="Attente max (s) d'un pairing (long polling)"
+    ),
 ):
-    service = FridgeService(db)
-    status = service.get_fridge_status(kiosk_id)
+    with subscribe_kiosk(kiosk_id) as events:
+        status = await run_in_threadpool(_load_kiosk_status, kiosk_id)
+
+        if not status:
+            raise HTTPException(status_code=404, detail="Kiosk not found")
 
-    if not status:
-        raise HTTPException(status_code=404, detail="Kiosk not found")
+        if wait and not status["is_paired"]:
+            status = await _wait_for_pairing(kiosk_id, events, wait) or status
 
     return status
 
 
+@router.websocket("/kiosk/{kiosk_id}/status")
+async def kiosk_status_socket(websocket: WebSocket, kiosk_id: str):
+    await websocket.accept()
+
+    with subscribe_kiosk(kiosk_id) as events:
+        status = await run_in_threadpool(_load_kiosk_status, kiosk_id)
+
+        if not status:
+            await websocket.close(code=4404, reason="Kiosk not found")
+            return
+
+        if not status["is_paired"]:
+            paired = asyncio.ensure_future(
+                _wait_for_pairing(
+                    kiosk_id, events, settings.DEVICE_PAIRING_TIMEOUT_MINUTES * 60
+                )
+            )
+            disconnected = asyncio.ensure_future(websocket.receive())
+            done, pending = await asyncio.wait(
+                {paired, disconnected}, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in pending:
+                task.cancel()
+
+            if paired not in done or paired.result() is None:
+                if (
+                    disconnected not in done
+                    or disconnected.result()["type"] != "websocket.disconnect"
+                ):
+                    await websocket.close()
+                return
+
+            status = paired.result()
+
+    await websocket.send_json({"event": "paired", **status})
+    await websocket.close()
+
+
 @router.post("/pair", response_model=PairingResponse)
 def pair_fridge(
     request: PairingRequest,
@@ -104,6 +195,10 @@ def pair_fridge(
             detail="Code invalide, expiré ou frigo déjà pairé",
         )
 
+    publish_kiosk_event(
+        result["kiosk_id"], {"event": "paired", "fridge_id": result["fridge_id"]}
+    )
+
     return result
 
 
@@ -206,7 +301,7 @@ def get_fridge_summary(
 @router.post("/{fridge_id}/register-fcm-token")
 async def register_fcm_token(
     fridge_id: int,
-    request: dict,                        
+    request: dict,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
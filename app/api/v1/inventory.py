@@ -1,15 +1,22 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, raiseload, selectinload
 from datetime import datetime, date, timedelta
 
-from app.core.database import get_db
+from app.core.cache import cache_get, cache_set
+from app.core.database import get_db, utc_now
 from app.core.dependencies import get_fridge_access_hybrid
 from app.models.fridge import Fridge
 from app.models.inventory import InventoryItem
 from app.models.product import Product
 from app.models.alert import Alert
 from app.models.event import Event
-from app.services.notification_service import NotificationService
+from app.services.inventory_service import (
+    ACTIVE_ITEMS_CACHE_TTL_SECONDS,
+    InventoryService,
+    active_items_cache_key,
+)
+from app.services.alert_service import mark_alerts_changed
+from app.tasks.notifications import send_batch_scan_task, send_smart_inventory_task
 
 from app.schemas.inventory import (
     InventoryItemCreate,
@@ -25,9 +32,11 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/fridges/{fridge_id}/inventory", tags=["Inventory"])
 
 
-def _enrich_inventory_response(item: InventoryItem, db: Session) -> dict:
-    product = db.query(Product).filter(Product.id == item.product_id).first()
+def _enrich_inventory_response(item: InventoryItem) -> dict:
+    return _inventory_payload(item, item.product)
+
 
+def _inventory_payload(item, product) -> dict:
     freshness_status = "unknown"
     days_until_expiry = None
     freshness_label = None
@@ -84,11 +93,27 @@ def list_inventory(
     db: Session = Depends(get_db),
     active_only: bool = True,
 ):
-    query = db.query(InventoryItem).filter(InventoryItem.fridge_id == fridge.id)
+    cache_key = active_items_cache_key(fridge.id)
     if active_only:
-        query = query.filter(InventoryItem.quantity > 0)
-    items = query.all()
-    return [_enrich_inventory_response(item, db) for item in items]
+        cached = cache_get(cache_key)
+        if cached is not None:
+            return cached
+
+    if not active_only:
+        query = (
+            db.query(InventoryItem)
+            .options(selectinload(InventoryItem.product))
+            .filter(InventoryItem.fridge_id == fridge.id)
+        )
+        return [_enrich_inventory_response(item) for item in query]
+
+    # Lignes produit jointes : name est NULL seulement si le produit manque
+    items = [
+        _inventory_payload(row, row if row.name is not None else None)
+        for row in InventoryService(db).list_active_rows(fridge.id)
+    ]
+    cache_set(cache_key, items, ACTIVE_ITEMS_CACHE_TTL_SECONDS)
+    return items
 
 
 @router.post("", status_code=201)
@@ -111,7 +136,7 @@ def add_inventory_item(
         product = db.query(Product).filter(Product.name.ilike(product_name)).first()
 
         if not product:
-            logger.info(f"Creating new product: {product_name}")
+            logger.info("Creating new product: %s", product_name)
             product = Product(
                 name=product_name.capitalize(),
                 category=request.category or "Divers",
@@ -133,13 +158,14 @@ def add_inventory_item(
         if product.shelf_life_days:
             expiry_date = date.today() + timedelta(days=product.shelf_life_days)
             logger.info(
-                f"📅 Auto-calculated expiry: {expiry_date} "
-                f"({product.shelf_life_days} days from today)"
+                "Auto-calculated expiry: %s (%s days from today)",
+                expiry_date,
+                product.shelf_life_days,
             )
         else:
             expiry_date = date.today() + timedelta(days=7)
             logger.warning(
-                f"No shelf_life_days for {product.name}, using default 7 days"
+                "No shelf_life_days for %s, using default 7 days", product.name
             )
 
     existing_item = (
@@ -153,8 +179,6 @@ def add_inventory_item(
     )
 
     try:
-        notification_service = NotificationService(db)
-
         freshness_status = "fresh"
         if expiry_date:
             days_until_expiry = (expiry_date - date.today()).days
@@ -165,7 +189,7 @@ def add_inventory_item(
             elif days_until_expiry <= 3:
                 freshness_status = "expiring_soon"
 
-        notification_service.send_smart_inventory_notification(
+        send_smart_inventory_task(
             fridge_id=fridge.id,
             action="added",
             product_name=product.name,
@@ -175,14 +199,16 @@ def add_inventory_item(
             expiry_date=expiry_date,
             source="manual",
         )
-        logger.info("Smart notification sent for product addition")
+        logger.info("Smart notification queued for product addition")
     except Exception as e:
-        logger.error(f"Failed to send notification: {e}")
+        logger.error("Failed to send notification: %s", e)
 
     if existing_item:
         logger.info(
-            f"Updating existing item: {product.name} "
-            f"(current: {existing_item.quantity}, adding: {request.quantity})"
+            "Updating existing item: %s (current: %s, adding: %s)",
+            product.name,
+            existing_item.quantity,
+            request.quantity,
         )
 
         old_quantity = existing_item.quantity
@@ -193,7 +219,7 @@ def add_inventory_item(
             not existing_item.expiry_date or expiry_date > existing_item.expiry_date
         ):
             logger.info(
-                f"Updating expiry date: {existing_item.expiry_date} → {expiry_date}"
+                "Updating expiry date: %s -> %s", existing_item.expiry_date, expiry_date
             )
             existing_item.expiry_date = expiry_date
 
@@ -213,17 +239,18 @@ def add_inventory_item(
         )
         db.add(event)
         db.commit()
-        db.refresh(existing_item)
 
         logger.info(
-            f"Item updated: {product.name} "
-            f"(total: {existing_item.quantity} {existing_item.unit})"
+            "Item updated: %s (total: %s %s)",
+            product.name,
+            existing_item.quantity,
+            existing_item.unit,
         )
 
-        return _enrich_inventory_response(existing_item, db)
+        return _enrich_inventory_response(existing_item)
 
     else:
-        logger.info(f"Creating new inventory item: {product.name}")
+        logger.info("Creating new inventory item: %s", product.name)
 
         inventory_item = InventoryItem(
             fridge_id=fridge.id,
@@ -253,14 +280,15 @@ def add_inventory_item(
         )
         db.add(event)
         db.commit()
-        db.refresh(inventory_item)
 
         logger.info(
-            f"New item created: {product.name} "
-            f"({request.quantity} {inventory_item.unit})"
+            "New item created: %s (%s %s)",
+            product.name,
+            request.quantity,
+            inventory_item.unit,
         )
 
-        return _enrich_inventory_response(inventory_item, db)
+        return _enrich_inventory_response(inventory_item)
 
 
 @router.put("/{item_id}")
@@ -281,7 +309,7 @@ def update_inventory_item(
     old_quantity = item.quantity
     old_expiry_date = item.expiry_date
 
-    product = db.query(Product).filter(Product.id == item.product_id).first()
+    product = item.product
 
     if request.quantity is not None:
         if request.quantity < 0:
@@ -320,14 +348,13 @@ def update_inventory_item(
         db.add(event)
 
     db.commit()
-    db.refresh(item)
 
-    try:
-        notification_service = NotificationService(db)
+    today = date.today()
 
+    try:
         freshness_status = "fresh"
         if item.expiry_date:
-            days_until_expiry = (item.expiry_date - date.today()).days
+            days_until_expiry = (item.expiry_date - today).days
             if days_until_expiry < 0:
                 freshness_status = "expired"
             elif days_until_expiry == 0:
@@ -335,7 +362,7 @@ def update_inventory_item(
             elif days_until_expiry <= 3:
                 freshness_status = "expiring_soon"
 
-        notification_service.send_smart_inventory_notification(
+        send_smart_inventory_task(
             fridge_id=fridge.id,
             action="updated",
             product_name=product.name if product else f"Produit #{item.product_id}",
@@ -348,7 +375,7 @@ def update_inventory_item(
             source="manual",
         )
     except Exception as e:
-        logger.error(f"Failed to send notification: {e}")
+        logger.error("Failed to send notification: %s", e)
 
     if request.expiry_date is not None:
         from app.services.alert_service import AlertService
@@ -363,14 +390,17 @@ def update_inventory_item(
             Alert.type.in_(["EXPIRY_SOON", "EXPIRED"]),
             Alert.status == "pending",
         ).delete()
+        mark_alerts_changed(db, [fridge.id])
 
-        new_alert = alert_service._check_expiry_alert(item, fridge.id, expiry_days)
+        new_alert = alert_service._check_expiry_alert(
+            item, fridge.id, expiry_days, today=today
+        )
         if new_alert:
-            logger.info(f"New expiry alert created after update: {item.id}")
+            logger.info("New expiry alert created after update: %s", item.id)
 
         db.commit()
 
-    return _enrich_inventory_response(item, db)
+    return _enrich_inventory_response(item)
 
 
 @router.post("/{item_id}/consume")
@@ -414,7 +444,7 @@ def consume_item(
         item.open_date = date.today()
 
     item.quantity = new_quantity
-    product = db.query(Product).filter(Product.id == item.product_id).first()
+    product = item.product
 
     from app.services.alert_service import AlertService
 
@@ -423,9 +453,12 @@ def consume_item(
     if new_quantity == 0:
         db.query(Alert).filter(
             Alert.inventory_item_id == item_id, Alert.status == "pending"
-        ).update({"status": "resolved", "resolved_at": datetime.utcnow()})
+        ).update(
+            {"status": "resolved", "resolved_at": utc_now()}, synchronize_session=False
+        )
 
-        logger.info(f"Resolved all alerts for consumed item {item_id}")
+        mark_alerts_changed(db, [fridge.id])
+        logger.info("Resolved all alerts for consumed item %s", item_id)
 
     else:
         db.query(Alert).filter(
@@ -433,6 +466,7 @@ def consume_item(
             Alert.type == "LOW_STOCK",
             Alert.status == "pending",
         ).delete()
+        mark_alerts_changed(db, [fridge.id])
 
         config = fridge.config or {}
         low_stock_threshold = config.get("low_stock_threshold", 2.0)
@@ -459,11 +493,9 @@ def consume_item(
     )
     db.add(event)
     db.commit()
-    db.refresh(item)
 
     try:
-        notification_service = NotificationService(db)
-        notification_service.send_smart_inventory_notification(
+        send_smart_inventory_task(
             fridge_id=fridge.id,
             action="consumed",
             product_name=product.name if product else f"Produit #{item.product_id}",
@@ -473,11 +505,11 @@ def consume_item(
             freshness_status=freshness_status,
             expiry_date=item.expiry_date,
         )
-        logger.info("Smart notification sent for consumption")
+        logger.info("Smart notification queued for consumption")
     except Exception as e:
-        logger.error(f"Failed to send notification: {e}")
+        logger.error("Failed to send notification: %s", e)
 
-    return _enrich_inventory_response(item, db)
+    return _enrich_inventory_response(item)
 
 
 @router.delete("/{item_id}", status_code=204)
@@ -494,7 +526,7 @@ def remove_inventory_item(
     if not item:
         raise HTTPException(status_code=404, detail="Inventory item not found")
 
-    product = db.query(Product).filter(Product.id == item.product_id).first()
+    product = item.product
 
     freshness_status = "unknown"
     if item.expiry_date:
@@ -510,13 +542,15 @@ def remove_inventory_item(
 
     db.query(Alert).filter(
         Alert.inventory_item_id == item_id, Alert.status == "pending"
-    ).update({"status": "resolved", "resolved_at": datetime.utcnow()})
+    ).update(
+        {"status": "resolved", "resolved_at": utc_now()}, synchronize_session=False
+    )
 
-    logger.info(f"Resolved all alerts for deleted item {item_id}")
+    mark_alerts_changed(db, [fridge.id])
+    logger.info("Resolved all alerts for deleted item %s", item_id)
 
     try:
-        notification_service = NotificationService(db)
-        notification_service.send_smart_inventory_notification(
+        send_smart_inventory_task(
             fridge_id=fridge.id,
             action="removed",
             product_name=product.name if product else f"Produit #{item.product_id}",
@@ -527,7 +561,7 @@ def remove_inventory_item(
             source="manual",
         )
     except Exception as e:
-        logger.error(f"Failed to send notification: {e}")
+        logger.error("Failed to send notification: %s", e)
 
     event = Event(
         fridge_id=fridge.id,
@@ -563,129 +597,122 @@ def consume_items_batch(
 
     notification_products = []
 
-    for item_req in request.items:
-        try:
-            item = (
-                db.query(InventoryItem)
-                .filter(
-                    InventoryItem.id == item_req.inventory_item_id,
-                    InventoryItem.fridge_id == fridge.id,
-                )
-                .first()
-            )
-
-            if not item:
-                results.append(
-                    {
-                        "item_id": item_req.inventory_item_id,
-                        "status": "not_found",
-                        "error": "Item not found",
-                    }
-                )
-                failed_count += 1
-                continue
-
-            if item.quantity < item_req.quantity_consumed:
-                results.append(
-                    {
-                        "item_id": item_req.inventory_item_id,
-                        "status": "insufficient_quantity",
-                        "error": f"Only {item.quantity} {item.unit} available",
-                        "requested": item_req.quantity_consumed,
-                    }
-                )
-                failed_count += 1
-                continue
-
-            freshness_status = "unknown"
-            if item.expiry_date:
-                days_until_expiry = (item.expiry_date - date.today()).days
-
-                if days_until_expiry < 0:
-                    freshness_status = "expired"
-                elif days_until_expiry == 0:
-                    freshness_status = "expires_today"
-                elif days_until_expiry <= 3:
-                    freshness_status = "expiring_soon"
-                else:
-                    freshness_status = "fresh"
-
-            old_quantity = item.quantity
-            item.quantity -= item_req.quantity_consumed
-
-            if item.quantity > 0 and not item.open_date:
-                item.open_date = date.today()
-
-            product = db.query(Product).filter(Product.id == item.product_id).first()
+    # Items et produits chargés en deux requêtes pour tout le lot
+    items_by_id = {
+        item.id: item
+        for item in db.query(InventoryItem)
+        .options(selectinload(InventoryItem.product), raiseload("*"))
+        .filter(
+            InventoryItem.id.in_([req.inventory_item_id for req in request.items]),
+            InventoryItem.fridge_id == fridge.id,
+        )
+    }
 
-            event = Event(
-                fridge_id=fridge.id,
-                inventory_item_id=item.id,
-                type="ITEM_CONSUMED",
-                payload={
-                    "source": "vision_consume",
-                    "product_name": product.name if product else "Unknown",
-                    "detected_as": item_req.detected_product_name,
-                    "quantity_consumed": item_req.quantity_consumed,
-                    "unit": item.unit,
-                    "remaining": item.quantity,
-                    "old_quantity": old_quantity,
-                    "freshness_status": freshness_status,
-                },
-            )
-            db.add(event)
+    # Validation en mémoire, puis un seul UPDATE et un seul INSERT d'événements
+    available = {item_id: item.quantity for item_id, item in items_by_id.items()}
+    consumed = []
+    event_payloads = []
 
-            notification_products.append(
-                {
-                    "product_name": product.name if product else "Unknown",
-                    "action": "consumed",
-                    "quantity": item_req.quantity_consumed,
-                    "remaining_quantity": item.quantity,
-                    "unit": item.unit,
-                    "freshness_status": freshness_status,
-                    "expiry_date": item.expiry_date,
-                }
-            )
+    for item_req in request.items:
+        item = items_by_id.get(item_req.inventory_item_id)
 
+        if not item:
             results.append(
                 {
-                    "item_id": item.id,
-                    "status": "success",
-                    "product_name": product.name if product else "Unknown",
-                    "consumed": item_req.quantity_consumed,
-                    "remaining": item.quantity,
+                    "item_id": item_req.inventory_item_id,
+                    "status": "not_found",
+                    "error": "Item not found",
                 }
             )
-            success_count += 1
+            failed_count += 1
+            continue
 
-        except Exception as e:
+        if available[item.id] < item_req.quantity_consumed:
             results.append(
                 {
                     "item_id": item_req.inventory_item_id,
-                    "status": "error",
-                    "error": str(e),
+                    "status": "insufficient_quantity",
+                    "error": f"Only {available[item.id]} {item.unit} available",
+                    "requested": item_req.quantity_consumed,
                 }
             )
             failed_count += 1
+            continue
 
-    db.commit()
+        freshness_status = "unknown"
+        if item.expiry_date:
+            days_until_expiry = (item.expiry_date - date.today()).days
 
-    if notification_products:
-        try:
-            from app.services.notification_service import NotificationService
+            if days_until_expiry < 0:
+                freshness_status = "expired"
+            elif days_until_expiry == 0:
+                freshness_status = "expires_today"
+            elif days_until_expiry <= 3:
+                freshness_status = "expiring_soon"
+            else:
+                freshness_status = "fresh"
+
+        product = item.product
+        product_name = product.name if product else "Unknown"
+
+        # Un événement par ligne, comme avant le passage en bulk
+        event_payloads.append(
+            {
+                "source": "vision_consume",
+                "product_name": product_name,
+                "detected_as": item_req.detected_product_name,
+                "old_quantity": available[item.id],
+                "freshness_status": freshness_status,
+            }
+        )
+        available[item.id] -= item_req.quantity_consumed
+        consumed.append((item.id, item_req.quantity_consumed))
+
+        notification_products.append(
+            {
+                "product_name": product_name,
+                "action": "consumed",
+                "quantity": item_req.quantity_consumed,
+                "remaining_quantity": available[item.id],
+                "unit": item.unit,
+                "freshness_status": freshness_status,
+                "expiry_date": item.expiry_date,
+            }
+        )
 
-            notification_service = NotificationService(db)
+        results.append(
+            {
+                "item_id": item.id,
+                "status": "success",
+                "product_name": product_name,
+                "consumed": item_req.quantity_consumed,
+                "remaining": available[item.id],
+            }
+        )
+        success_count += 1
 
-            notification_service.send_batch_scan_notification(
+    if consumed:
+        try:
+            InventoryService(db).consume_items_bulk(
+                consumed, event_payloads=event_payloads
+            )
+        except ValueError as e:
+            # Quantité consommée entre-temps par une autre requête
+            raise HTTPException(status_code=409, detail=str(e))
+
+    if notification_products:
+        try:
+            send_batch_scan_task(
                 fridge_id=fridge.id,
                 scan_type="consume",
                 products=notification_products,
             )
             logger.info(
-                f"Sent batch consume notification for {len(notification_products)} products"
+                "Queued batch consume notification for %s products",
+                len(notification_products),
             )
         except Exception as e:
-            logger.error(f" Failed to send batch consume notification: {e}")
+            logger.error("Failed to send batch consume notification: %s", e)
 
     return ConsumeBatchResponse(
         success_count=success_count,
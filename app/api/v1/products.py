@@ -2,11 +2,13 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
+from app.core.cache import cache_delete
 from app.core.database import get_db
 from app.core.dependencies import get_current_user
 from app.models.product import Product
 from app.models.user import User
 from app.schemas.product import ProductResponse, ProductCreate, ProductUpdate
+from app.services.inventory_service import product_cache_key
 
 router = APIRouter(prefix="/products", tags=["Products"])
 
@@ -70,6 +72,7 @@ def update_product(
         setattr(product, key, value)
 
     db.commit()
+    cache_delete(product_cache_key(product_id))
     db.refresh(product)
     return product
 
@@ -87,4 +90,5 @@ def delete_product(
 
     db.delete(product)
     db.commit()
+    cache_delete(product_cache_key(product_id))
     return None 
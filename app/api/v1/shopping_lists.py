@@ -275,7 +275,7 @@ def generate_shopping_list_from_ingredients(
         f"recipe_id={shopping_list.recipe_id}"
     )
 
-    return shopping_list
+    return _enrich_shopping_list_response(shopping_list, db)
 
 
 @router.get("", response_model=List[Dict])
@@ -1,5 +1,5 @@
 from app.core.config import settings
-from app.core.database import Base, engine, SessionLocal, get_db
+from app.core.database import Base, engine, SessionLocal, BackgroundSessionLocal, get_db
 from app.core.security import (
     get_password_hash,
     verify_password,
@@ -14,6 +14,7 @@ __all__ = [
     "Base",
     "engine",
     "SessionLocal",
+    "BackgroundSessionLocal",
     "get_db",
     "get_password_hash",
     "verify_password",
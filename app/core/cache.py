@@ -0,0 +1,104 @@
+from typing import Any, Callable, Dict, Iterable, Optional
+import logging
+
+import orjson
+import redis
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_redis_client: Optional[redis.Redis] = None
+
+# Clés à supprimer au commit, stockées dans session.info
+PENDING_CACHE_KEYS = "pending_cache_keys"
+
+# Modèle -> clés de cache à invalider quand une de ses lignes est flushée
+_flush_invalidations: Dict[type, Callable[[Any], Iterable[str]]] = {}
+
+
+def get_redis() -> Optional[redis.Redis]:
+    """Client Redis partagé, ou None si REDIS_URL n'est pas configuré"""
+    global _redis_client
+
+    if not settings.REDIS_URL:
+        return None
+
+    if _redis_client is None:
+        _redis_client = redis.Redis.from_url(
+            settings.REDIS_URL, socket_timeout=0.5, socket_connect_timeout=0.5
+        )
+
+    return _redis_client
+
+
+def cache_get(key: str) -> Optional[Any]:
+    client = get_redis()
+    if client is None:
+        return None
+
+    try:
+        raw = client.get(key)
+    except redis.RedisError as e:
+        logger.warning(f"Cache read failed for {key}: {e}")
+        return None
+
+    return orjson.loads(raw) if raw is not None else None
+
+
+def cache_set(key: str, value: Any, ttl_seconds: int) -> None:
+    client = get_redis()
+    if client is None:
+        return
+
+    try:
+        client.setex(key, ttl_seconds, orjson.dumps(value))
+    except redis.RedisError as e:
+        logger.warning(f"Cache write failed for {key}: {e}")
+
+
+def cache_delete(*keys: str) -> None:
+    client = get_redis()
+    if client is None or not keys:
+        return
+
+    try:
+        client.delete(*keys)
+    except redis.RedisError as e:
+        logger.warning(f"Cache delete failed for {keys}: {e}")
+
+
+def delete_on_commit(session: Session, keys: Iterable[str]) -> None:
+    """Supprime les clés après le commit de la session, oubliées au rollback"""
+    session.info.setdefault(PENDING_CACHE_KEYS, set()).update(keys)
+
+
+def invalidate_on_flush(model: type, keys_for: Callable[[Any], Iterable[str]]) -> None:
+    """Invalide au commit les clés de chaque objet `model` ajouté, modifié ou supprimé"""
+    _flush_invalidations[model] = keys_for
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_flushed_keys(session, flush_context):
+    keys = set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        keys_for = _flush_invalidations.get(type(obj))
+        if keys_for is not None:
+            keys.update(keys_for(obj))
+
+    if keys:
+        delete_on_commit(session, keys)
+
+
+@event.listens_for(Session, "after_commit")
+def _delete_committed_keys(session):
+    keys = session.info.pop(PENDING_CACHE_KEYS, None)
+    if keys:
+        cache_delete(*keys)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_keys(session):
+    session.info.pop(PENDING_CACHE_KEYS, None)
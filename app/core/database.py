@@ -1,19 +1,44 @@
-from sqlalchemy import create_engine
+import orjson
+from sqlalchemy import create_engine, func, make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 from app.core.config import settings
 
+engine_options = {}
+if make_url(settings.DATABASE_URL).get_driver_name() == "psycopg2":
+    # Regroupe aussi les UPDATE/DELETE executemany (flush ORM) en lots
+    engine_options["executemany_mode"] = "values_plus_batch"
+
+
+def _json_dumps(value) -> str:
+    # Colonnes JSON (payload, config, extra_data) sérialisées en C
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
 engine = create_engine(
     settings.DATABASE_URL,
     pool_pre_ping=True,
     pool_size=20,
     max_overflow=40,
     pool_recycle=3600,
+    json_serializer=_json_dumps,
+    json_deserializer=orjson.loads,
+    **engine_options,
 )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Jobs de fond et notifications : session propre au job, objets relus après
+# commit sans SELECT (ils ne sont pas partagés avec d'autres sessions)
+BackgroundSessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, expire_on_commit=False, bind=engine
+)
 Base = declarative_base()
 
 
+def utc_now():
+    """Horodatage UTC naïf généré par la base (convention des colonnes DateTime)"""
+    return func.timezone("utc", func.now())
+
+
 def get_db() -> Session:
     db = SessionLocal()
     try:
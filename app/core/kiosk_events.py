@@ -0,0 +1,109 @@
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Set, Tuple
+import asyncio
+import logging
+import threading
+import time
+
+import orjson
+import redis
+
+from app.core.cache import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Canal Redis par kiosk : le pairing peut arriver sur un autre worker
+KIOSK_EVENTS_CHANNEL_PREFIX = "kiosk_events:"
+
+# Abonnés en attente d'un pairing, par kiosk_id (propre à chaque worker)
+_subscribers: Dict[str, Set[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+_lock = threading.Lock()
+_listener: Optional[threading.Thread] = None
+
+
+def _deliver(kiosk_id: str, event: Dict[str, Any]) -> None:
+    with _lock:
+        waiters = list(_subscribers.get(kiosk_id, ()))
+
+    for loop, queue in waiters:
+        try:
+            loop.call_soon_threadsafe(queue.put_nowait, event)
+        except RuntimeError:
+            logger.debug(f"Dropped kiosk event for {kiosk_id}: loop closed")
+
+
+def _listen_redis() -> None:
+    """Relaie les événements publiés par les autres workers aux abonnés locaux"""
+    while True:
+        client = get_redis()
+        if client is None:
+            return
+
+        try:
+            pubsub = client.pubsub(ignore_subscribe_messages=True)
+            pubsub.psubscribe(f"{KIOSK_EVENTS_CHANNEL_PREFIX}*")
+
+            while True:
+                message = pubsub.get_message(timeout=1.0)
+                if message is None:
+                    continue
+
+                channel = message["channel"].decode()
+                _deliver(
+                    channel[len(KIOSK_EVENTS_CHANNEL_PREFIX) :],
+                    orjson.loads(message["data"]),
+                )
+
+        except redis.RedisError as e:
+            logger.warning(f"Kiosk event listener disconnected: {e}")
+            time.sleep(1)
+
+
+def _ensure_listener() -> None:
+    global _listener
+
+    if get_redis() is None:
+        return
+
+    # Relancé si le thread s'est arrêté (Redis désactivé, erreur inattendue)
+    with _lock:
+        if _listener is None or not _listener.is_alive():
+            _listener = threading.Thread(
+                target=_listen_redis, name="kiosk-events", daemon=True
+            )
+            _listener.start()
+
+
+@contextmanager
+def subscribe_kiosk(kiosk_id: str) -> Iterator[asyncio.Queue]:
+    """Abonne l'appelant aux événements du kiosk (à utiliser depuis la boucle)"""
+    _ensure_listener()
+    entry = (asyncio.get_running_loop(), asyncio.Queue())
+
+    with _lock:
+        _subscribers.setdefault(kiosk_id, set()).add(entry)
+
+    try:
+        yield entry[1]
+    finally:
+        with _lock:
+            waiters = _subscribers.get(kiosk_id)
+            if waiters is not None:
+                waiters.discard(entry)
+                if not waiters:
+                    del _subscribers[kiosk_id]
+
+
+def publish_kiosk_event(kiosk_id: str, event: Dict[str, Any]) -> None:
+    """Notifie les abonnés du kiosk ; appelable depuis n'importe quel thread"""
+    client = get_redis()
+    if client is not None:
+        try:
+            client.publish(
+                f"{KIOSK_EVENTS_CHANNEL_PREFIX}{kiosk_id}", orjson.dumps(event)
+            )
+            return
+        except redis.RedisError as e:
+            logger.warning(f"Kiosk event publish failed for {kiosk_id}: {e}")
+
+    _deliver(kiosk_id, event)
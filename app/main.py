@@ -1,10 +1,12 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from contextlib import asynccontextmanager
 
 from app.core.config import settings
 from app.core.database import engine, Base
+from app.services.notification_service import smtp_pool
+from app.tasks.notifications import shutdown_notification_workers
 from app.tasks.scheduler import start_scheduler, stop_scheduler
 from app.utils.exceptions import FridgeNotFoundError
 
@@ -37,9 +39,16 @@ async def lifespan(app: FastAPI):
 
     print("Arrêt de l'application...")
     stop_scheduler()
+    shutdown_notification_workers()
+    smtp_pool.close_all()
 
 
-app = FastAPI(title=settings.APP_NAME, version=settings.VERSION, lifespan=lifespan)
+app = FastAPI(
+    title=settings.APP_NAME,
+    version=settings.VERSION,
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
 
 
 origins = settings.ALLOWED_ORIGINS
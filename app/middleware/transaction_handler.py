@@ -12,7 +12,7 @@ def transactional(func):
         try:
             result = await func(self, *args, **kwargs)
             db.commit()
-            logger.info(f"Transaction committed in {func.__name__}")
+            logger.debug("Transaction committed in %s", func.__name__)
             return result
         except Exception as e:
             db.rollback()
@@ -25,7 +25,7 @@ def transactional(func):
         try:
             result = func(self, *args, **kwargs)
             db.commit()
-            logger.info(f"Transaction committed in {func.__name__}")
+            logger.debug("Transaction committed in %s", func.__name__)
             return result
         except Exception as e:
             db.rollback()
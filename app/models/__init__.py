@@ -3,6 +3,7 @@ from app.models.fridge import Fridge
 from app.models.product import Product
 from app.models.inventory import InventoryItem
 from app.models.event import Event
+from app.models.consumption import DailyConsumption
 from app.models.alert import Alert
 from app.models.recipe import Recipe, RecipeIngredient, RecipeFavorite
 from app.models.shopping_list import ShoppingList, ShoppingListItem
@@ -13,6 +14,7 @@ __all__ = [
     "Product",
     "InventoryItem",
     "Event",
+    "DailyConsumption",
     "Alert",
     "Recipe",
     "RecipeIngredient",
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Index
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Index, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.core.database import Base
@@ -33,7 +33,19 @@ class Alert(Base):
     __table_args__ = (
         Index("ix_alert_fridge_status", "fridge_id", "status"),
         Index("ix_alert_fridge_type_status", "fridge_id", "type", "status"),
+        Index(
+            "ix_alert_fridge_item_type_status",
+            "fridge_id",
+            "inventory_item_id",
+            "type",
+            "status",
+        ),
         Index("ix_alert_created_status", "created_at", "status"),
+        Index(
+            "ix_alert_item_pending",
+            "inventory_item_id",
+            postgresql_where=text("status = 'pending'"),
+        ),
     )
 
     def __repr__(self):
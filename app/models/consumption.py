@@ -0,0 +1,63 @@
+from sqlalchemy import Column, Integer, Float, String, ForeignKey, Date, DDL, event
+from app.core.database import Base
+from app.models.event import Event
+
+
+class DailyConsumption(Base):
+    __tablename__ = "fridge_daily_consumption"
+
+    fridge_id = Column(
+        Integer, ForeignKey("fridges.id", ondelete="CASCADE"), primary_key=True
+    )
+    product_id = Column(
+        Integer, ForeignKey("products.id", ondelete="CASCADE"), primary_key=True
+    )
+    day = Column(Date, primary_key=True)
+
+    unit = Column(String)
+    count = Column(Integer, nullable=False, default=0)
+    quantity = Column(Float, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<DailyConsumption(fridge_id={self.fridge_id}, product_id={self.product_id}, day={self.day})>"
+
+
+# Même trigger que la migration 3b7d9e1f4a62, pour les bases créées par create_all
+RECORD_DAILY_CONSUMPTION_FN = DDL("""
+    CREATE OR REPLACE FUNCTION record_daily_consumption() RETURNS trigger AS $$
+    BEGIN
+        INSERT INTO fridge_daily_consumption (fridge_id, product_id, day, unit, count, quantity)
+        SELECT NEW.fridge_id, i.product_id, NEW.created_at::date, i.unit, 1,
+               CASE WHEN json_typeof(NEW.payload -> 'quantity_consumed') = 'number'
+                    THEN (NEW.payload ->> 'quantity_consumed')::float ELSE 0 END
+        FROM inventory_items i
+        WHERE i.id = NEW.inventory_item_id
+        ON CONFLICT (fridge_id, product_id, day) DO UPDATE
+        SET count = fridge_daily_consumption.count + 1,
+            quantity = fridge_daily_consumption.quantity + EXCLUDED.quantity,
+            unit = EXCLUDED.unit;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+""")
+
+RECORD_DAILY_CONSUMPTION_TRIGGER = DDL("""
+    CREATE TRIGGER trg_events_daily_consumption
+    AFTER INSERT ON events
+    FOR EACH ROW WHEN (NEW.type = 'ITEM_CONSUMED')
+    EXECUTE FUNCTION record_daily_consumption()
+""")
+
+# Le trigger porte sur events : la table doit exister avant celle-ci
+DailyConsumption.__table__.add_is_dependent_on(Event.__table__)
+
+event.listen(
+    DailyConsumption.__table__,
+    "after_create",
+    RECORD_DAILY_CONSUMPTION_FN.execute_if(dialect="postgresql"),
+)
+event.listen(
+    DailyConsumption.__table__,
+    "after_create",
+    RECORD_DAILY_CONSUMPTION_TRIGGER.execute_if(dialect="postgresql"),
+)
@@ -27,7 +27,7 @@ class Event(Base):
     inventory_item = relationship("InventoryItem", back_populates="events")
     
     __table_args__ = (
-        Index('ix_event_fridge_created', 'fridge_id', 'created_at'),
+        Index('ix_event_fridge_created_type', 'fridge_id', created_at.desc(), 'type'),
         Index('ix_event_fridge_type', 'fridge_id', 'type'),
         Index('ix_event_item_created', 'inventory_item_id', 'created_at'),
     )
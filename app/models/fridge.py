@@ -1,9 +1,31 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, JSON, DateTime, Boolean
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+    ForeignKey,
+    JSON,
+    DateTime,
+    Boolean,
+    Index,
+    text,
+)
 from sqlalchemy.orm import relationship
 from datetime import datetime
+import json
 from app.core.database import Base
 
 
+DEFAULT_FRIDGE_CONFIG = {
+    "expiry_warning_days": 3,
+    "lost_item_threshold_hours": 72,
+    "low_stock_threshold": 2.0,
+}
+
+
+def _default_fridge_config():
+    return dict(DEFAULT_FRIDGE_CONFIG)
+
+
 class Fridge(Base):
     __tablename__ = "fridges"
 
@@ -37,7 +59,11 @@ class Fridge(Base):
     kiosk_metadata = Column(JSON, default=dict)
 
                    
-    config = Column(JSON, default=dict)
+    config = Column(
+        JSON,
+        default=_default_fridge_config,
+        server_default=text(f"'{json.dumps(DEFAULT_FRIDGE_CONFIG)}'"),
+    )
 
            
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -46,13 +72,22 @@ class Fridge(Base):
                
     user = relationship("User", back_populates="fridges")
     inventory_items = relationship(
-        "InventoryItem", back_populates="fridge", cascade="all, delete-orphan"
+        "InventoryItem",
+        back_populates="fridge",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
     )
     events = relationship(
-        "Event", back_populates="fridge", cascade="all, delete-orphan"
+        "Event",
+        back_populates="fridge",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
     )
     alerts = relationship(
-        "Alert", back_populates="fridge", cascade="all, delete-orphan"
+        "Alert",
+        back_populates="fridge",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
     )
     shopping_lists = relationship(
         "ShoppingList", back_populates="fridge", cascade="all, delete-orphan"
@@ -70,6 +105,15 @@ class Fridge(Base):
         cascade="all, delete-orphan"
     )
 
+    __table_args__ = (
+        Index(
+            "ix_fridge_pairing_code_unpaired",
+            "pairing_code",
+            "created_at",
+            postgresql_where=text("is_paired = false"),
+        ),
+    )
+
     def __repr__(self):
         status = "PAIRED" if self.is_paired else "UNPAIRED"
         return f"<Fridge(id={self.id}, kiosk_id={self.kiosk_id}, status={status})>"
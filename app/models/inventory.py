@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, String, ForeignKey, Date, DateTime, JSON, Index
+from sqlalchemy import Column, Integer, Float, String, ForeignKey, Date, DateTime, JSON, Index, CheckConstraint, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.core.database import Base
@@ -45,6 +45,14 @@ class InventoryItem(Base):
         Index('ix_inventory_fridge_expiry', 'fridge_id', 'expiry_date'),
         Index('ix_inventory_fridge_lastseen', 'fridge_id', 'last_seen_at'),
         Index('ix_inventory_expiry_quantity', 'expiry_date', 'quantity'),
+        Index(
+            'ix_inventory_active_fridge_expiry',
+            'fridge_id',
+            'expiry_date',
+            postgresql_where=text('quantity > 0'),
+        ),
+        # RG9 : une quantité ne peut pas être négative
+        CheckConstraint('quantity >= 0', name='ck_inventory_quantity_nonneg'),
     )
 
     def __repr__(self):
@@ -40,6 +40,8 @@ class PaginatedEventsResponse(BaseModel):
     page_size: int
     total_pages: int
     filters: EventFilterParams
+    next_before: Optional[datetime] = None
+    next_before_id: Optional[int] = None
 
     class Config:
         from_attributes = True
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field, field_validator
 from typing import Optional, List, Dict, Any
 
 
@@ -12,25 +12,34 @@ class ProductCreate(BaseModel):
     tags: Optional[List[str]] = None
     extra_data: Optional[Dict[str, Any]] = None
 
-    @validator("barcode")
+    @field_validator("barcode")
+    @classmethod
     def validate_barcode(cls, v):
         if v and not v.isdigit():
             raise ValueError("Le code-barres doit contenir uniquement des chiffres")
         return v
 
-    @validator("name")
+    @field_validator("name")
+    @classmethod
     def validate_name(cls, v):
         if not v or not v.strip():
             raise ValueError("Le nom du produit ne peut pas être vide")
         return v.strip()
 
-    @validator("tags", each_item=True)
+    @field_validator("tags")
+    @classmethod
     def validate_tags(cls, v):
-        if not v or not v.strip():
-            raise ValueError("Les tags ne peuvent pas être vides")
-        if len(v) > 50:
-            raise ValueError("Les tags ne peuvent pas dépasser 50 caractères")
-        return v.lower().strip()
+        if v is None:
+            return v
+
+        cleaned = []
+        for tag in v:
+            if not tag or not tag.strip():
+                raise ValueError("Les tags ne peuvent pas être vides")
+            if len(tag) > 50:
+                raise ValueError("Les tags ne peuvent pas dépasser 50 caractères")
+            cleaned.append(tag.lower().strip())
+        return cleaned
 
 
 class ProductUpdate(BaseModel):
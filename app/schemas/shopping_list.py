@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field, validator, model_validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 
@@ -26,24 +26,24 @@ class ShoppingListCreate(BaseModel):
     items: List[ShoppingListItemCreate] = Field(..., min_length=1)
     name: Optional[str] = None
 
-    @validator("items")
+    @field_validator("items")
+    @classmethod
     def validate_items(cls, v):
         """Vérifier qu'il n'y a pas de doublons (product_id OU product_name)"""
         if not v:
             return v
 
-        seen = set()
-        for item in v:
-            if item.product_id is not None:
-                key = ("id", item.product_id)
-            elif item.product_name is not None:
-                key = ("name", item.product_name.strip().lower())
-            else:
-                continue
-
-            if key in seen:
-                raise ValueError("La liste contient des produits en double")
-            seen.add(key)
+        keys = [
+            (
+                ("id", item.product_id)
+                if item.product_id is not None
+                else ("name", item.product_name.strip().lower())
+            )
+            for item in v
+            if item.product_id is not None or item.product_name is not None
+        ]
+        if len(set(keys)) != len(keys):
+            raise ValueError("La liste contient des produits en double")
 
         return v
 
@@ -71,7 +71,8 @@ class GenerateFromIngredientsRequest(BaseModel):
             }
         }
 
-    @validator("ingredients")
+    @field_validator("ingredients")
+    @classmethod
     def validate_ingredients(cls, v):
         for ing in v:
             if not ing.get("name") or not str(ing.get("name")).strip():
@@ -88,8 +89,7 @@ class ShoppingListItemResponse(BaseModel):
     status: str
     product_name: Optional[str] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 
 class ShoppingListResponse(BaseModel):
@@ -101,5 +101,4 @@ class ShoppingListResponse(BaseModel):
     generated_by: Optional[str]
     items: List[ShoppingListItemResponse] = []
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True)
@@ -1,5 +1,8 @@
-from pydantic import BaseModel, EmailStr, Field, validator
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, field_validator
 from typing import Optional, List, Dict, Any
+import pytz
+
+_VALID_TIMEZONES = frozenset(pytz.all_timezones)
 
 
 class UserResponse(BaseModel):
@@ -11,8 +14,7 @@ class UserResponse(BaseModel):
     preferred_cuisine: Optional[str]
     dietary_restrictions: Optional[List[str]]
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, frozen=True)
 
 
 class UserUpdateRequest(BaseModel):
@@ -22,25 +24,31 @@ class UserUpdateRequest(BaseModel):
     timezone: Optional[str] = Field(None, max_length=50)
     prefs: Optional[Dict[str, Any]] = None
 
-    @validator("name")
+    @field_validator("name")
+    @classmethod
     def validate_name(cls, v):
         if v is not None and (not v or not v.strip()):
             raise ValueError("Le nom ne peut pas être vide")
         return v.strip() if v else v
 
-    @validator("timezone")
+    @field_validator("timezone")
+    @classmethod
     def validate_timezone(cls, v):
-        if v:
-            import pytz
-
-            try:
-                pytz.timezone(v)
-            except pytz.exceptions.UnknownTimeZoneError:
-                raise ValueError(f"Timezone invalide: {v}")
+        if v and v not in _VALID_TIMEZONES:
+            raise ValueError(f"Timezone invalide: {v}")
         return v
 
-    @validator("dietary_restrictions", each_item=True)
+    @field_validator("dietary_restrictions")
+    @classmethod
     def validate_dietary_restrictions(cls, v):
-        if not v or not v.strip():
-            raise ValueError("Les restrictions alimentaires ne peuvent pas être vides")
-        return v.lower().strip()
+        if v is None:
+            return v
+
+        cleaned = []
+        for restriction in v:
+            if not restriction or not restriction.strip():
+                raise ValueError(
+                    "Les restrictions alimentaires ne peuvent pas être vides"
+                )
+            cleaned.append(restriction.lower().strip())
+        return cleaned
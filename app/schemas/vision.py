@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import List, Optional, Dict, Any
 from datetime import date
 
@@ -24,6 +24,8 @@ class DetectedProductMatch(BaseModel):
 
     possible_matches: List[Dict[str, Any]] = []
 
+    model_config = ConfigDict(frozen=True)
+
 
 class ConsumeAnalysisResponse(BaseModel):
     timestamp: str
@@ -40,6 +42,8 @@ class VisionAnalysisResponse(BaseModel):
     needs_manual_entry: List[Dict[str, Any]]
     detected_products: List[Dict[str, Any]]
 
+    model_config = ConfigDict(frozen=True)
+
 
 class ManualEntryRequest(BaseModel):
     inventory_item_id: int
@@ -1,19 +1,62 @@
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, date, timedelta
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
-from typing import List, Optional, Dict, Any
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import Row, and_, delete, insert, select
+from typing import List, Optional, Dict, Any, Set, Tuple
 import logging
 
 from app.middleware.transaction_handler import transactional
 from app.models.alert import Alert
+from app.models.event import Event
 from app.models.inventory import InventoryItem
 from app.models.fridge import Fridge
-from app.models.user import User
+from app.core.cache import cache_get, cache_set, delete_on_commit, invalidate_on_flush
 from app.core.config import settings
-from app.services.notification_service import NotificationService
+from app.core.database import BackgroundSessionLocal
+from app.services.notification_service import AlertNotification, NotificationService
 
 logger = logging.getLogger(__name__)
 
+ALERT_CHECK_MAX_WORKERS = 8
+
+STATS_CACHE_TTL_SECONDS = 30
+
+
+def alert_stats_cache_key(fridge_id: int) -> str:
+    return f"fridge:{fridge_id}:alert_stats"
+
+
+def mark_alerts_changed(session: Session, fridge_ids) -> None:
+    # Statistiques invalidées au commit (écritures Core hors flush ORM)
+    delete_on_commit(session, (alert_stats_cache_key(fid) for fid in fridge_ids))
+
+
+invalidate_on_flush(Alert, lambda alert: [alert_stats_cache_key(alert.fridge_id)])
+
+
+EXPIRED_TMPL = (
+    "{name} a expiré il y a {days} jour(s). "
+    "Quantité : {q} {u}. "
+    "À retirer immédiatement du réfrigérateur."
+)
+EXPIRES_TODAY_TMPL = (
+    "{name} expire AUJOURD'HUI ! Quantité : {q} {u}. À consommer rapidement."
+)
+EXPIRY_SOON_TMPL = "{name} expire dans {days} jour(s) ({date}). Quantité : {q} {u}."
+LOST_ITEM_TMPL = (
+    "{name} n'a pas été détecté depuis "
+    "{days} jour(s) et {hours} heure(s). "
+    "Quantité théorique : {q} {u}. "
+    "Le produit a peut-être été consommé ou déplacé."
+)
+LOW_STOCK_TMPL = (
+    "Stock faible pour {name}. "
+    "Quantité actuelle : {q} {u}. "
+    "Seuil minimum : {min_q} {u}. "
+    "Pensez à en racheter."
+)
+
 
 class AlertService:
     def __init__(self, db: Session):
@@ -21,8 +64,12 @@ class AlertService:
         self.notification_service = NotificationService(db)
 
     def check_and_create_alerts(
-        self, fridge_id: Optional[int] = None, send_notifications: bool = True
+        self,
+        fridge_id: Optional[int] = None,
+        send_notifications: bool = True,
+        notify_in_background: bool = False,
     ) -> Dict[str, int]:
+        """Crée les alertes manquantes ; notify_in_background pour les requêtes HTTP"""
         stats = {
             "EXPIRY_SOON": 0,
             "EXPIRED": 0,
@@ -31,97 +78,210 @@ class AlertService:
             "total_notified": 0,
         }
 
-        query = self.db.query(Fridge)
+        query = self.db.query(Fridge.id)
         if fridge_id:
             query = query.filter(Fridge.id == fridge_id)
 
-        fridges = query.all()
-        logger.info(f"Checking alerts for {len(fridges)} fridge(s)")
-
-        for fridge in fridges:
-            config = fridge.config or {}
-            expiry_days = config.get(
-                "expiry_warning_days", settings.EXPIRY_WARNING_DAYS
+        fridge_ids = [fid for (fid,) in query.all()]
+        logger.info(f"Checking alerts for {len(fridge_ids)} fridge(s)")
+
+        today = date.today()
+        now = datetime.utcnow()
+
+        if fridge_id is None and len(fridge_ids) > 1:
+            # Chaque thread ne reçoit que des ids et recharge tout dans sa session
+            workers = min(ALERT_CHECK_MAX_WORKERS, len(fridge_ids))
+            chunks = [fridge_ids[i::workers] for i in range(workers)]
+
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results = [
+                    fridge_stats
+                    for chunk_stats in pool.map(
+                        lambda chunk: self._check_fridges_in_new_session(
+                            chunk, today, now, send_notifications, notify_in_background
+                        ),
+                        chunks,
+                    )
+                    for fridge_stats in chunk_stats
+                ]
+        else:
+            results = self._check_fridges(
+                fridge_ids, today, now, send_notifications, notify_in_background
             )
-            lost_hours = config.get(
-                "lost_item_threshold_hours", settings.LOST_ITEM_HOURS
+
+        for fridge_stats in results:
+            for key, value in fridge_stats.items():
+                stats[key] += value
+
+        logger.info(f"Alert check completed. Stats: {stats}")
+        return stats
+
+    def _check_fridges_in_new_session(
+        self,
+        fridge_ids: List[int],
+        today: date,
+        now: datetime,
+        send_notifications: bool,
+        notify_in_background: bool = False,
+    ) -> List[Dict[str, int]]:
+        """Vérifie des frigos dans leur propre session (exécuté dans un thread)"""
+        db = BackgroundSessionLocal()
+        try:
+            return AlertService(db)._check_fridges(
+                fridge_ids, today, now, send_notifications, notify_in_background
             )
-            low_stock_threshold = config.get("low_stock_threshold", 2.0)
+        finally:
+            db.close()
 
-            user = fridge.user
+    def _check_fridges(
+        self,
+        fridge_ids: List[int],
+        today: date,
+        now: datetime,
+        send_notifications: bool,
+        notify_in_background: bool = False,
+    ) -> List[Dict[str, int]]:
+        if not fridge_ids:
+            return []
+
+        fridges = (
+            self.db.query(Fridge)
+            .options(joinedload(Fridge.user))
+            .filter(Fridge.id.in_(fridge_ids))
+            .all()
+        )
 
-            items = (
-                self.db.query(InventoryItem)
-                .filter(
-                    InventoryItem.fridge_id == fridge.id, InventoryItem.quantity > 0
-                )
-                .all()
+        items_by_fridge: Dict[int, List[InventoryItem]] = defaultdict(list)
+        items = (
+            self.db.query(InventoryItem)
+            .options(joinedload(InventoryItem.product))
+            .filter(
+                InventoryItem.fridge_id.in_(fridge_ids),
+                InventoryItem.quantity > 0,
             )
+            .all()
+        )
+        for item in items:
+            items_by_fridge[item.fridge_id].append(item)
 
-            logger.info(f"Checking {len(items)} items in fridge {fridge.id}")
+        # Notifications envoyées après le lot : un seul chargement des appareils
+        outbox: Optional[List[AlertNotification]] = [] if send_notifications else None
+        results = [
+            self._check_fridge(fridge, items_by_fridge[fridge.id], today, now, outbox)
+            for fridge in fridges
+        ]
 
-            new_alerts = []
+        if outbox and notify_in_background:
+            from app.tasks.notifications import send_alert_notifications_task
 
-            for item in items:
-                expiry_alert = self._check_expiry_alert(item, fridge.id, expiry_days)
-                if expiry_alert:
-                    new_alerts.append(expiry_alert)
-                    stats[expiry_alert.type] += 1
+            send_alert_notifications_task(outbox)
+        elif outbox:
+            self.notification_service.send_alert_notifications(outbox)
 
-                lost_alert = self._check_lost_item_alert(item, fridge.id, lost_hours)
-                if lost_alert:
-                    new_alerts.append(lost_alert)
-                    stats["LOST_ITEM"] += 1
+        return results
 
-                stock_alert = self._check_low_stock_alert(
-                    item, fridge.id, low_stock_threshold
-                )
-                if stock_alert:
-                    new_alerts.append(stock_alert)
-                    stats["LOW_STOCK"] += 1
+    def _check_fridge(
+        self,
+        fridge: Fridge,
+        items: List[InventoryItem],
+        today: date,
+        now: datetime,
+        outbox: Optional[List[AlertNotification]] = None,
+    ) -> Dict[str, int]:
+        stats = defaultdict(int)
+
+        config = fridge.config or {}
+        expiry_days = config.get("expiry_warning_days", settings.EXPIRY_WARNING_DAYS)
+        lost_hours = config.get("lost_item_threshold_hours", settings.LOST_ITEM_HOURS)
+        low_stock_threshold = config.get("low_stock_threshold", 2.0)
+        lost_cutoff = now - timedelta(hours=lost_hours)
+
+        # Destinataire lu avant le commit de _insert_alerts (qui expire la session)
+        user = fridge.user
+        recipient = (user.id, user.email) if user else None
+
+        logger.info(f"Checking {len(items)} items in fridge {fridge.id}")
+
+        existing_keys = self._get_pending_alert_keys(fridge.id)
+        pending_rows: List[Dict[str, Any]] = []
+
+        for item in items:
+            self._check_expiry_alert(
+                item,
+                fridge.id,
+                expiry_days,
+                existing_keys,
+                today=today,
+                pending_rows=pending_rows,
+            )
+            self._check_lost_item_alert(
+                item,
+                fridge.id,
+                lost_hours,
+                existing_keys,
+                now=now,
+                cutoff=lost_cutoff,
+                pending_rows=pending_rows,
+            )
+            self._check_low_stock_alert(
+                item,
+                fridge.id,
+                low_stock_threshold,
+                existing_keys,
+                pending_rows=pending_rows,
+            )
 
-            if send_notifications and new_alerts and user:
-                self._send_alert_notifications(new_alerts, user)
-                stats["total_notified"] += len(new_alerts)
+        new_alerts = self._insert_alerts(pending_rows)
+        for alert in new_alerts:
+            stats[alert.type] += 1
+
+        if outbox is not None and new_alerts and recipient:
+            outbox.append((*recipient, new_alerts))
+            stats["total_notified"] += len(new_alerts)
 
-        logger.info(f"Alert check completed. Stats: {stats}")
         return stats
 
+    def _get_pending_alert_keys(self, fridge_id: int) -> Set[Tuple[int, str]]:
+        rows = (
+            self.db.query(Alert.inventory_item_id, Alert.type)
+            .filter(Alert.fridge_id == fridge_id, Alert.status == "pending")
+            .all()
+        )
+        return {(item_id, alert_type) for item_id, alert_type in rows}
+
     def _check_expiry_alert(
-        self, item: InventoryItem, fridge_id: int, warning_days: int
+        self,
+        item: InventoryItem,
+        fridge_id: int,
+        warning_days: int,
+        existing_keys: Optional[Set[Tuple[int, str]]] = None,
+        today: Optional[date] = None,
+        pending_rows: Optional[List[Dict[str, Any]]] = None,
     ) -> Optional[Alert]:
         if not item.expiry_date:
             return None
 
-        days_until_expiry = (item.expiry_date - date.today()).days
+        days_until_expiry = (item.expiry_date - (today or date.today())).days
 
         alert_type = None
         message = None
         priority = "normal"
+        ctx = {"name": item.product.name, "q": item.quantity, "u": item.unit}
 
         if days_until_expiry < 0:
             alert_type = "EXPIRED"
-            message = (
-                f"{item.product.name} a expiré il y a {abs(days_until_expiry)} jour(s). "
-                f"Quantité : {item.quantity} {item.unit}. "
-                f"À retirer immédiatement du réfrigérateur."
-            )
+            ctx["days"] = abs(days_until_expiry)
+            message = EXPIRED_TMPL.format_map(ctx)
             priority = "high"
         elif days_until_expiry == 0:
             alert_type = "EXPIRY_SOON"
-            message = (
-                f"{item.product.name} expire AUJOURD'HUI ! "
-                f"Quantité : {item.quantity} {item.unit}. "
-                f"À consommer rapidement."
-            )
+            message = EXPIRES_TODAY_TMPL.format_map(ctx)
             priority = "high"
         elif days_until_expiry <= warning_days:
             alert_type = "EXPIRY_SOON"
-            message = (
-                f"{item.product.name} expire dans {days_until_expiry} jour(s) "
-                f"({item.expiry_date.strftime('%d/%m/%Y')}). "
-                f"Quantité : {item.quantity} {item.unit}."
-            )
+            ctx["days"] = days_until_expiry
+            ctx["date"] = item.expiry_date.strftime("%d/%m/%Y")
+            message = EXPIRY_SOON_TMPL.format_map(ctx)
             priority = "normal"
 
         if alert_type:
@@ -131,29 +291,41 @@ class AlertService:
                 alert_type=alert_type,
                 message=message,
                 metadata={"priority": priority, "days_until_expiry": days_until_expiry},
+                existing_keys=existing_keys,
+                pending_rows=pending_rows,
             )
 
         return None
 
     def _check_lost_item_alert(
-        self, item: InventoryItem, fridge_id: int, threshold_hours: int
+        self,
+        item: InventoryItem,
+        fridge_id: int,
+        threshold_hours: int,
+        existing_keys: Optional[Set[Tuple[int, str]]] = None,
+        now: Optional[datetime] = None,
+        cutoff: Optional[datetime] = None,
+        pending_rows: Optional[List[Dict[str, Any]]] = None,
     ) -> Optional[Alert]:
         if not item.last_seen_at:
             return None
 
-        hours_since_seen = (
-            datetime.utcnow() - item.last_seen_at
-        ).total_seconds() / 3600
+        now = now or datetime.utcnow()
+        cutoff = cutoff or now - timedelta(hours=threshold_hours)
 
-        if hours_since_seen > threshold_hours:
+        if item.last_seen_at < cutoff:
+            hours_since_seen = (now - item.last_seen_at).total_seconds() / 3600
             days = int(hours_since_seen / 24)
             hours = int(hours_since_seen % 24)
 
-            message = (
-                f"{item.product.name} n'a pas été détecté depuis "
-                f"{days} jour(s) et {hours} heure(s). "
-                f"Quantité théorique : {item.quantity} {item.unit}. "
-                f"Le produit a peut-être été consommé ou déplacé."
+            message = LOST_ITEM_TMPL.format_map(
+                {
+                    "name": item.product.name,
+                    "days": days,
+                    "hours": hours,
+                    "q": item.quantity,
+                    "u": item.unit,
+                }
             )
 
             return self._create_alert_if_not_exists(
@@ -165,12 +337,19 @@ class AlertService:
                     "hours_since_seen": int(hours_since_seen),
                     "last_seen_at": item.last_seen_at.isoformat(),
                 },
+                existing_keys=existing_keys,
+                pending_rows=pending_rows,
             )
 
         return None
 
     def _check_low_stock_alert(
-        self, item: InventoryItem, fridge_id: int, threshold: float
+        self,
+        item: InventoryItem,
+        fridge_id: int,
+        threshold: float,
+        existing_keys: Optional[Set[Tuple[int, str]]] = None,
+        pending_rows: Optional[List[Dict[str, Any]]] = None,
     ) -> Optional[Alert]:
         if not item.product.extra_data:
             return None
@@ -180,11 +359,13 @@ class AlertService:
             return None
 
         if item.quantity <= min_quantity:
-            message = (
-                f"Stock faible pour {item.product.name}. "
-                f"Quantité actuelle : {item.quantity} {item.unit}. "
-                f"Seuil minimum : {min_quantity} {item.unit}. "
-                f"Pensez à en racheter."
+            message = LOW_STOCK_TMPL.format_map(
+                {
+                    "name": item.product.name,
+                    "q": item.quantity,
+                    "u": item.unit,
+                    "min_q": min_quantity,
+                }
             )
 
             return self._create_alert_if_not_exists(
@@ -196,11 +377,12 @@ class AlertService:
                     "current_quantity": item.quantity,
                     "min_quantity": min_quantity,
                 },
+                existing_keys=existing_keys,
+                pending_rows=pending_rows,
             )
 
         return None
 
-    @transactional
     def _create_alert_if_not_exists(
         self,
         fridge_id: int,
@@ -208,26 +390,63 @@ class AlertService:
         alert_type: str,
         message: str,
         metadata: Optional[Dict[str, Any]] = None,
+        existing_keys: Optional[Set[Tuple[int, str]]] = None,
+        pending_rows: Optional[List[Dict[str, Any]]] = None,
     ) -> Optional[Alert]:
-        existing = (
-            self.db.query(Alert)
-            .filter(
-                and_(
-                    Alert.fridge_id == fridge_id,
-                    Alert.inventory_item_id == inventory_item_id,
-                    Alert.type == alert_type,
-                    Alert.status == "pending",
+        if existing_keys is not None:
+            exists = (inventory_item_id, alert_type) in existing_keys
+        else:
+            exists = (
+                self.db.query(Alert.id)
+                .filter(
+                    and_(
+                        Alert.fridge_id == fridge_id,
+                        Alert.inventory_item_id == inventory_item_id,
+                        Alert.type == alert_type,
+                        Alert.status == "pending",
+                    )
                 )
+                .first()
+                is not None
             )
-            .first()
-        )
 
-        if existing:
+        if exists:
             logger.debug(
                 f"Alert already exists: {alert_type} for item {inventory_item_id}"
             )
             return None
 
+        if pending_rows is not None:
+            pending_rows.append(
+                {
+                    "fridge_id": fridge_id,
+                    "inventory_item_id": inventory_item_id,
+                    "type": alert_type,
+                    "message": message,
+                    "metadata": metadata,
+                }
+            )
+            if existing_keys is not None:
+                existing_keys.add((inventory_item_id, alert_type))
+            return None
+
+        alert = self._create_alert(
+            fridge_id, inventory_item_id, alert_type, message, metadata
+        )
+
+        if existing_keys is not None:
+            existing_keys.add((inventory_item_id, alert_type))
+        return alert
+
+    @transactional
+    def _create_alert(
+        self,
+        fridge_id: int,
+        inventory_item_id: int,
+        alert_type: str,
+        message: str,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> Alert:
         alert = Alert(
             fridge_id=fridge_id,
             inventory_item_id=inventory_item_id,
@@ -237,8 +456,6 @@ class AlertService:
         )
 
         if metadata:
-            from app.models.event import Event
-
             event = Event(
                 fridge_id=fridge_id,
                 inventory_item_id=inventory_item_id,
@@ -254,29 +471,57 @@ class AlertService:
         logger.info(f"Created alert: {alert_type} for item {inventory_item_id}")
         return alert
 
-    def _send_alert_notifications(self, alerts: List[Alert], user: User):
-        try:
-            high_priority_alerts = [
-                a for a in alerts if a.type in ["EXPIRED", "EXPIRY_SOON"]
-            ]
-
-            if high_priority_alerts:
-                for alert in high_priority_alerts:
-                    self.notification_service.notify_alert(
-                        alert=alert, user=user, channels=["push", "email"]
-                    )
-            else:
-                for alert in alerts:
-                    self.notification_service.notify_alert(
-                        alert=alert, user=user, channels=["push"]
-                    )
-
-            logger.info(
-                f"Sent notifications for {len(alerts)} alerts to user {user.id}"
-            )
+    @transactional
+    def _insert_alerts(self, pending_rows: List[Dict[str, Any]]) -> List[Row]:
+        """Insère en une seule requête les alertes collectées pour un frigo
+
+        Retourne des lignes (pas des objets ORM) : elles restent lisibles après
+        le commit, sans SELECT de rafraîchissement par alerte.
+        """
+        if not pending_rows:
+            return []
+
+        alerts = self.db.execute(
+            insert(Alert).returning(
+                Alert.id,
+                Alert.fridge_id,
+                Alert.inventory_item_id,
+                Alert.type,
+                Alert.message,
+                Alert.created_at,
+            ),
+            [
+                {
+                    "fridge_id": row["fridge_id"],
+                    "inventory_item_id": row["inventory_item_id"],
+                    "type": row["type"],
+                    "message": row["message"],
+                    "status": "pending",
+                }
+                for row in pending_rows
+            ],
+        ).all()
+
+        events = [
+            {
+                "fridge_id": row["fridge_id"],
+                "inventory_item_id": row["inventory_item_id"],
+                "type": "ALERT_CREATED",
+                "payload": {"alert_type": row["type"], "metadata": row["metadata"]},
+            }
+            for row in pending_rows
+            if row["metadata"]
+        ]
+        if events:
+            self.db.execute(insert(Event), events)
+
+        mark_alerts_changed(self.db, [pending_rows[0]["fridge_id"]])
+        self.db.commit()
 
-        except Exception as e:
-            logger.error(f"Failed to send alert notifications: {e}")
+        logger.info(
+            f"Created {len(alerts)} alerts for fridge {pending_rows[0]['fridge_id']}"
+        )
+        return alerts
 
     def get_alerts(
         self,
@@ -309,8 +554,6 @@ class AlertService:
 
         alert.status = "resolved"
 
-        from app.models.event import Event
-
         event = Event(
             fridge_id=alert.fridge_id,
             inventory_item_id=alert.inventory_item_id,
@@ -331,24 +574,20 @@ class AlertService:
     def bulk_resolve_alerts(
         self, fridge_id: int, user_id: int, alert_type: Optional[str] = None
     ) -> int:
-        query = (
-            self.db.query(Alert)
-            .join(Fridge)
-            .filter(
-                Alert.fridge_id == fridge_id,
-                Alert.status == "pending",
-                Fridge.user_id == user_id,
-            )
+        owned_fridge = select(Fridge.id).where(
+            Fridge.id == fridge_id, Fridge.user_id == user_id
+        )
+
+        query = self.db.query(Alert).filter(
+            Alert.fridge_id.in_(owned_fridge),
+            Alert.status == "pending",
         )
 
         if alert_type:
             query = query.filter(Alert.type == alert_type)
 
-        alerts = query.all()
-        count = len(alerts)
-
-        for alert in alerts:
-            alert.status = "resolved"
+        count = query.update({Alert.status: "resolved"}, synchronize_session=False)
+        mark_alerts_changed(self.db, [fridge_id])
 
         self.db.commit()
         logger.info(f"Bulk resolved {count} alerts for fridge {fridge_id}")
@@ -358,51 +597,59 @@ class AlertService:
     def delete_old_alerts(self, days: int = 30) -> int:
         cutoff_date = datetime.utcnow() - timedelta(days=days)
 
-        old_alerts = (
-            self.db.query(Alert)
-            .filter(Alert.status == "resolved", Alert.created_at < cutoff_date)
-            .all()
-        )
-
-        count = len(old_alerts)
-
-        for alert in old_alerts:
-            self.db.delete(alert)
+        fridge_ids = self.db.scalars(
+            delete(Alert)
+            .where(Alert.status == "resolved", Alert.created_at < cutoff_date)
+            .returning(Alert.fridge_id)
+            .execution_options(synchronize_session=False)
+        ).all()
+        mark_alerts_changed(self.db, fridge_ids)
 
         self.db.commit()
-        logger.info(f"Deleted {count} old alerts")
-        return count
+        logger.info(f"Deleted {len(fridge_ids)} old alerts")
+        return len(fridge_ids)
 
     def get_alert_statistics(self, fridge_id: int) -> Dict[str, Any]:
-        """Génère des statistiques sur les alertes d'un frigo"""
+        """Génère des statistiques sur les alertes d'un frigo (cache de 30 s)"""
         from sqlalchemy import func
 
-        type_stats = (
-            self.db.query(Alert.type, func.count(Alert.id).label("count"))
-            .filter(Alert.fridge_id == fridge_id)
-            .group_by(Alert.type)
-            .all()
-        )
+        cache_key = alert_stats_cache_key(fridge_id)
+        cached = cache_get(cache_key)
+        if cached is not None:
+            return cached
+
+        week_ago = datetime.utcnow() - timedelta(days=7)
 
-        status_stats = (
-            self.db.query(Alert.status, func.count(Alert.id).label("count"))
+        rows = (
+            self.db.query(
+                Alert.type,
+                Alert.status,
+                func.count(Alert.id).label("count"),
+                func.count(Alert.id)
+                .filter(Alert.created_at >= week_ago)
+                .label("recent_count"),
+            )
             .filter(Alert.fridge_id == fridge_id)
-            .group_by(Alert.status)
+            .group_by(Alert.type, Alert.status)
             .all()
         )
 
-        week_ago = datetime.utcnow() - timedelta(days=7)
-        recent_count = (
-            self.db.query(Alert)
-            .filter(Alert.fridge_id == fridge_id, Alert.created_at >= week_ago)
-            .count()
-        )
+        by_type: Dict[str, int] = {}
+        by_status: Dict[str, int] = {}
+        recent_count = 0
 
-        return {
-            "by_type": {stat.type: stat.count for stat in type_stats},
-            "by_status": {stat.status: stat.count for stat in status_stats},
+        for row in rows:
+            by_type[row.type] = by_type.get(row.type, 0) + row.count
+            by_status[row.status] = by_status.get(row.status, 0) + row.count
+            recent_count += row.recent_count
+
+        stats = {
+            "by_type": by_type,
+            "by_status": by_status,
             "recent_alerts": recent_count,
-            "pending_count": sum(
-                stat.count for stat in status_stats if stat.status == "pending"
-            ),
+            "pending_count": by_status.get("pending", 0),
         }
+
+        cache_set(cache_key, stats, STATS_CACHE_TTL_SECONDS)
+
+        return stats
@@ -1,15 +1,38 @@
+from sqlalchemy import Date, Row, case, cast, func, insert, select, tuple_
 from sqlalchemy.orm import Session
-from typing import List, Optional, Dict, Any
-from datetime import datetime, timedelta
+from typing import List, Optional, Dict, Any, Tuple
+from datetime import date, datetime, timedelta, timezone
 import logging
 
+from app.core.cache import cache_get, cache_set
 from app.middleware.transaction_handler import transactional
+from app.models.consumption import DailyConsumption
 from app.models.event import Event
-from app.models.inventory import InventoryItem
 from app.models.product import Product
 
 logger = logging.getLogger(__name__)
 
+# Les colonnes DateTime sont naïves et stockent de l'UTC
+_UTC = timezone.utc
+
+EVENT_STATS_CACHE_TTL_SECONDS = 60
+EVENT_CLEANUP_BATCH_SIZE = 10000
+
+EVENT_SOURCES = ("manual", "vision", "scan")
+
+EVENT_LIST_COLUMNS = (
+    Event.id,
+    Event.fridge_id,
+    Event.inventory_item_id,
+    Event.type,
+    Event.payload,
+    Event.created_at,
+)
+
+
+def _utilization_rate(items_added: int, items_consumed: int) -> float:
+    return round((items_consumed / items_added * 100), 1) if items_added > 0 else 0
+
 
 class EventService:
     def __init__(self, db: Session):
@@ -31,12 +54,33 @@ class EventService:
         )
 
         self.db.add(event)
-        self.db.commit()
-        self.db.refresh(event)
+        self.db.flush()
 
-        logger.debug(f"Event created: {event.type} for fridge {fridge_id}")
+        logger.debug(f"Event created: {event_type} for fridge {fridge_id}")
         return event
 
+    @transactional
+    def create_events_bulk(self, events: List[Dict[str, Any]]) -> List[int]:
+        """Crée plusieurs événements en un seul INSERT (fridge_id, event_type, payload, inventory_item_id)"""
+        if not events:
+            return []
+
+        event_ids = self.db.scalars(
+            insert(Event).returning(Event.id),
+            [
+                {
+                    "fridge_id": event["fridge_id"],
+                    "inventory_item_id": event.get("inventory_item_id"),
+                    "type": event["event_type"],
+                    "payload": event.get("payload") or {},
+                }
+                for event in events
+            ],
+        ).all()
+
+        logger.debug(f"{len(event_ids)} events created in bulk")
+        return event_ids
+
     def get_events(
         self,
         fridge_id: int,
@@ -45,8 +89,11 @@ class EventService:
         offset: int = 0,
         start_date: Optional[datetime] = None,
         end_date: Optional[datetime] = None,
-    ) -> List[Event]:
-        query = self.db.query(Event).filter(Event.fridge_id == fridge_id)
+        before: Optional[datetime] = None,
+        before_id: Optional[int] = None,
+    ) -> List[Row]:
+        """Liste paginée par offset, ou par curseur (before, before_id) si fourni"""
+        query = self.db.query(*EVENT_LIST_COLUMNS).filter(Event.fridge_id == fridge_id)
 
         if event_type:
             query = query.filter(Event.type == event_type)
@@ -57,44 +104,44 @@ class EventService:
         if end_date:
             query = query.filter(Event.created_at <= end_date)
 
-        return query.order_by(Event.created_at.desc()).offset(offset).limit(limit).all()
+        query = query.order_by(Event.created_at.desc(), Event.id.desc())
 
-    def get_event_statistics(self, fridge_id: int, days: int = 30) -> Dict[str, Any]:
-        from sqlalchemy import func
+        if before is not None:
+            if before_id is not None:
+                query = query.filter(
+                    tuple_(Event.created_at, Event.id) < tuple_(before, before_id)
+                )
+            else:
+                query = query.filter(Event.created_at < before)
+        elif offset:
+            query = query.offset(offset)
 
-        cutoff_date = datetime.utcnow() - timedelta(days=days)
+        return query.limit(limit).all()
 
-        total_events = (
-            self.db.query(func.count(Event.id))
-            .filter(Event.fridge_id == fridge_id, Event.created_at >= cutoff_date)
-            .scalar()
-            or 0
-        )
+    def get_event_statistics(self, fridge_id: int, days: int = 30) -> Dict[str, Any]:
+        cache_key = f"stats:events:{fridge_id}:{days}"
+        cached = cache_get(cache_key)
+        if cached is not None:
+            return cached
 
-        events_by_type = (
-            self.db.query(Event.type, func.count(Event.id).label("count"))
-            .filter(Event.fridge_id == fridge_id, Event.created_at >= cutoff_date)
-            .group_by(Event.type)
-            .all()
-        )
+        cutoff_date = datetime.now(_UTC).replace(tzinfo=None) - timedelta(days=days)
 
-        by_type = {event_type: count for event_type, count in events_by_type}
+        by_type, sources = self._get_type_and_source_counts(fridge_id, cutoff_date)
+        total_events = sum(by_type.values())
 
         top_consumed = self._get_top_consumed_products(fridge_id, cutoff_date)
 
-        activity_by_day = self._get_activity_by_day(fridge_id, cutoff_date)
-
-        sources = self._get_source_distribution(fridge_id, cutoff_date)
-
-        daily_activity = self._get_daily_activity(fridge_id, cutoff_date)
+        daily_counts = self._get_daily_counts(fridge_id, cutoff_date)
+        activity_by_day = self._get_activity_by_day(daily_counts)
+        daily_activity = [
+            {"date": day.isoformat(), "count": count} for day, count in daily_counts
+        ]
 
         items_added = by_type.get("ITEM_ADDED", 0)
         items_consumed = by_type.get("ITEM_CONSUMED", 0)
-        utilization_rate = (
-            round((items_consumed / items_added * 100), 1) if items_added > 0 else 0
-        )
+        utilization_rate = _utilization_rate(items_added, items_consumed)
 
-        return {
+        stats = {
             "period_days": days,
             "total_events": total_events,
             "by_type": by_type,
@@ -107,79 +154,131 @@ class EventService:
             "items_consumed": items_consumed,
         }
 
+        cache_set(cache_key, stats, EVENT_STATS_CACHE_TTL_SECONDS)
+        return stats
+
+    def get_utilization(self, fridge_id: int, days: int = 30) -> Dict[str, Any]:
+        """Ajouts/consommations et taux d'utilisation en un seul agrégat"""
+        cutoff_date = datetime.now(_UTC).replace(tzinfo=None) - timedelta(days=days)
+
+        items_added, items_consumed = (
+            self.db.query(
+                func.count().filter(Event.type == "ITEM_ADDED"),
+                func.count().filter(Event.type == "ITEM_CONSUMED"),
+            )
+            .filter(Event.fridge_id == fridge_id, Event.created_at >= cutoff_date)
+            .one()
+        )
+
+        return {
+            "period_days": days,
+            "items_added": items_added,
+            "items_consumed": items_consumed,
+            "utilization_rate": _utilization_rate(items_added, items_consumed),
+        }
+
     def _get_top_consumed_products(
         self, fridge_id: int, cutoff_date: datetime, limit: int = 10
     ) -> List[Dict[str, Any]]:
-        consumption_events = (
-            self.db.query(Event)
+        """Produits les plus consommés depuis le jour de cutoff_date inclus
+
+        fridge_daily_consumption (alimentée par un trigger sur ITEM_CONSUMED)
+        est agrégée par jour : la fenêtre commence à minuit du jour de
+        cutoff_date et peut donc couvrir jusqu'à un jour de plus.
+        """
+        rows = (
+            self.db.query(
+                Product.name,
+                func.min(DailyConsumption.unit).label("unit"),
+                func.sum(DailyConsumption.count).label("count"),
+                func.sum(DailyConsumption.quantity).label("total_quantity"),
+            )
+            .join(Product, Product.id == DailyConsumption.product_id)
             .filter(
-                Event.fridge_id == fridge_id,
-                Event.type == "ITEM_CONSUMED",
-                Event.created_at >= cutoff_date,
+                DailyConsumption.fridge_id == fridge_id,
+                DailyConsumption.day >= cutoff_date.date(),
             )
+            .group_by(Product.name)
+            .order_by(func.sum(DailyConsumption.count).desc())
+            .limit(limit)
             .all()
         )
 
-        product_consumption = {}
-        for event in consumption_events:
-            if event.inventory_item_id:
-                item = (
-                    self.db.query(InventoryItem)
-                    .filter(InventoryItem.id == event.inventory_item_id)
-                    .first()
-                )
-
-                if item:
-                    product = (
-                        self.db.query(Product)
-                        .filter(Product.id == item.product_id)
-                        .first()
-                    )
-
-                    if product:
-                        product_name = product.name
-                        qty_consumed = event.payload.get("quantity_consumed", 0)
-
-                        if product_name not in product_consumption:
-                            product_consumption[product_name] = {
-                                "count": 0,
-                                "total_quantity": 0,
-                                "unit": item.unit,
-                            }
-
-                        product_consumption[product_name]["count"] += 1
-                        product_consumption[product_name]["total_quantity"] += (
-                            qty_consumed
-                        )
-
-        top_consumed = sorted(
-            product_consumption.items(), key=lambda x: x[1]["count"], reverse=True
-        )[:limit]
-
         return [
             {
-                "product_name": name,
-                "consumption_count": data["count"],
-                "total_quantity": data["total_quantity"],
-                "unit": data["unit"],
+                "product_name": row.name,
+                "consumption_count": row.count,
+                "total_quantity": row.total_quantity,
+                "unit": row.unit,
             }
-            for name, data in top_consumed
+            for row in rows
         ]
 
-    def _get_activity_by_day(
+    def _get_type_and_source_counts(
         self, fridge_id: int, cutoff_date: datetime
-    ) -> List[Dict[str, Any]]:
-        """Récupère l'activité par jour de la semaine"""
-        events = (
-            self.db.query(Event)
+    ) -> Tuple[Dict[str, int], Dict[str, int]]:
+        """Compte les événements par type et, pour ITEM_ADDED, par source"""
+        raw_source = Event.payload["source"].as_string()
+        source = case((raw_source.in_(EVENT_SOURCES), raw_source), else_="other").label(
+            "source"
+        )
+        rows = (
+            self.db.query(Event.type, source, func.count(Event.id))
             .filter(Event.fridge_id == fridge_id, Event.created_at >= cutoff_date)
+            .group_by(Event.type, source)
+            .all()
+        )
+
+        by_type: Dict[str, int] = {}
+        sources = dict.fromkeys(EVENT_SOURCES + ("other",), 0)
+        for event_type, name, count in rows:
+            by_type[event_type] = by_type.get(event_type, 0) + count
+            if event_type == "ITEM_ADDED":
+                sources[name] += count
+
+        return by_type, sources
+
+    def _get_daily_counts(
+        self, fridge_id: int, cutoff_date: datetime
+    ) -> List[Tuple[date, int]]:
+        day = cast(Event.created_at, Date).label("day")
+        return (
+            self.db.query(day, func.count(Event.id))
+            .filter(Event.fridge_id == fridge_id, Event.created_at >= cutoff_date)
+            .group_by(day)
+            .order_by(day)
+            .all()
+        )
+
+    def get_event_type_timeline(
+        self, fridge_id: int, event_type: str, cutoff_date: datetime
+    ) -> List[Row]:
+        """Compte par jour les événements d'un type (avec premier/dernier horodatage)"""
+        day = cast(Event.created_at, Date).label("day")
+        return (
+            self.db.query(
+                day,
+                func.count(Event.id).label("count"),
+                func.min(Event.created_at).label("first_at"),
+                func.max(Event.created_at).label("last_at"),
+            )
+            .filter(
+                Event.fridge_id == fridge_id,
+                Event.type == event_type,
+                Event.created_at >= cutoff_date,
+            )
+            .group_by(day)
+            .order_by(day)
             .all()
         )
 
+    def _get_activity_by_day(
+        self, daily_counts: List[Tuple[date, int]]
+    ) -> List[Dict[str, Any]]:
+        """Récupère l'activité par jour de la semaine"""
         day_activity = {i: 0 for i in range(7)}
-        for event in events:
-            day = event.created_at.weekday()
-            day_activity[day] += 1
+        for day, count in daily_counts:
+            day_activity[day.weekday()] += count
 
         day_names = [
             "Lundi",
@@ -195,51 +294,9 @@ class EventService:
             {"day": day_names[i], "count": count} for i, count in day_activity.items()
         ]
 
-    def _get_source_distribution(
-        self, fridge_id: int, cutoff_date: datetime
-    ) -> Dict[str, int]:
-        source_stats = (
-            self.db.query(Event.payload)
-            .filter(
-                Event.fridge_id == fridge_id,
-                Event.type == "ITEM_ADDED",
-                Event.created_at >= cutoff_date,
-            )
-            .all()
-        )
-
-        sources = {"manual": 0, "vision": 0, "scan": 0, "other": 0}
-        for (payload,) in source_stats:
-            source = payload.get("source", "other")
-            if source in sources:
-                sources[source] += 1
-            else:
-                sources["other"] += 1
-
-        return sources
-
-    def _get_daily_activity(
-        self, fridge_id: int, cutoff_date: datetime
-    ) -> List[Dict[str, Any]]:
-        events = (
-            self.db.query(Event)
-            .filter(Event.fridge_id == fridge_id, Event.created_at >= cutoff_date)
-            .all()
-        )
-
-        daily_counts = {}
-        for event in events:
-            date_str = event.created_at.date().isoformat()
-            daily_counts[date_str] = daily_counts.get(date_str, 0) + 1
-
-        return sorted(
-            [{"date": date, "count": count} for date, count in daily_counts.items()],
-            key=lambda x: x["date"],
-        )
-
-    def get_item_history(self, inventory_item_id: int, limit: int = 20) -> List[Event]:
+    def get_item_history(self, inventory_item_id: int, limit: int = 20) -> List[Row]:
         return (
-            self.db.query(Event)
+            self.db.query(*EVENT_LIST_COLUMNS)
             .filter(Event.inventory_item_id == inventory_item_id)
             .order_by(Event.created_at.desc())
             .limit(limit)
@@ -248,16 +305,26 @@ class EventService:
 
     @transactional
     def cleanup_old_events(self, days: int = 90) -> int:
-        cutoff_date = datetime.utcnow() - timedelta(days=days)
-
-        old_events = self.db.query(Event).filter(Event.created_at < cutoff_date).all()
+        cutoff_date = datetime.now(_UTC).replace(tzinfo=None) - timedelta(days=days)
 
-        count = len(old_events)
+        expired_batch = (
+            select(Event.id)
+            .where(Event.created_at < cutoff_date)
+            .limit(EVENT_CLEANUP_BATCH_SIZE)
+        )
 
-        for event in old_events:
-            self.db.delete(event)
+        count = 0
+        while True:
+            deleted = (
+                self.db.query(Event)
+                .filter(Event.id.in_(expired_batch))
+                .delete(synchronize_session=False)
+            )
+            self.db.commit()
+            count += deleted
 
-        self.db.commit()
+            if deleted < EVENT_CLEANUP_BATCH_SIZE:
+                break
 
         logger.info(f"Cleaned up {count} old events")
         return count
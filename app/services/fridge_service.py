@@ -1,21 +1,68 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import case, delete, func, lambda_stmt, select, true, update
+from sqlalchemy.orm import Session, raiseload
 from typing import Optional, List, Dict, Any
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 import logging
 import secrets
-import string
 import uuid
 
+import redis
+
 from app.middleware.transaction_handler import transactional
 from app.models.fridge import Fridge
 from app.models.inventory import InventoryItem
 from app.models.alert import Alert
 from app.models.event import Event
+from app.services.alert_service import mark_alerts_changed
+from app.services.inventory_service import mark_inventory_changed
+from app.core.cache import (
+    cache_delete,
+    cache_get,
+    cache_set,
+    delete_on_commit,
+    get_redis,
+)
 from app.core.config import settings
+from app.core.database import utc_now
 from app.core.security import create_access_token
 
 logger = logging.getLogger(__name__)
 
+# Les colonnes DateTime sont naïves et stockent de l'UTC
+_UTC = timezone.utc
+
+HEARTBEAT_KEY_PREFIX = "kiosk:hb:"
+HEARTBEAT_TTL_SECONDS = 120
+HEARTBEAT_FLUSH_BATCH_SIZE = 500
+
+_PAIRING_TTL_MINUTES = settings.DEVICE_PAIRING_TIMEOUT_MINUTES
+_PAIRING_TTL = timedelta(minutes=_PAIRING_TTL_MINUTES)
+
+KIOSK_STATUS_KEY_PREFIX = "kiosk:status:"
+# Inférieur à l'intervalle de polling du kiosk (5s)
+KIOSK_STATUS_CACHE_TTL_SECONDS = 4
+
+
+def _generate_pairing_code() -> str:
+    code_length = settings.DEVICE_PAIRING_CODE_LENGTH
+    return f"{secrets.randbelow(10**code_length):0{code_length}d}"
+
+
+def _kiosk_status_stmt(kiosk_id: str):
+    # Statement mis en cache par SQLAlchemy : pas de reconstruction par appel
+    stmt = lambda_stmt(
+        lambda: select(
+            Fridge.id,
+            Fridge.kiosk_id,
+            Fridge.is_paired,
+            Fridge.name,
+            Fridge.last_heartbeat,
+            Fridge.paired_at,
+        )
+    )
+    stmt += lambda s: s.where(Fridge.kiosk_id == kiosk_id)
+    return stmt
+
 
 class FridgeService:
     def __init__(self, db: Session):
@@ -45,8 +92,7 @@ class FridgeService:
                         "expires_in_minutes": 0,
                     }
                 else:
-                    timeout_minutes = settings.DEVICE_PAIRING_TIMEOUT_MINUTES
-                    valid_after = datetime.utcnow() - timedelta(minutes=timeout_minutes)
+                    valid_after = datetime.utcnow() - _PAIRING_TTL
 
                     if (
                         existing_fridge.created_at >= valid_after
@@ -55,24 +101,22 @@ class FridgeService:
                         return {
                             "kiosk_id": existing_fridge.kiosk_id,
                             "pairing_code": existing_fridge.pairing_code,
-                            "expires_in_minutes": settings.DEVICE_PAIRING_TIMEOUT_MINUTES,
+                            "expires_in_minutes": _PAIRING_TTL_MINUTES,
                             "is_paired": False,
                         }
                     else:
-                        existing_fridge.pairing_code = "".join(
-                            secrets.choice(string.digits) for _ in range(6)
-                        )
+                        existing_fridge.pairing_code = _generate_pairing_code()
                         existing_fridge.created_at = datetime.utcnow()
 
                         return {
                             "kiosk_id": existing_fridge.kiosk_id,
                             "pairing_code": existing_fridge.pairing_code,
-                            "expires_in_minutes": settings.DEVICE_PAIRING_TIMEOUT_MINUTES,
+                            "expires_in_minutes": _PAIRING_TTL_MINUTES,
                             "is_paired": False,
                         }
 
         kiosk_id = str(uuid.uuid4())
-        pairing_code = "".join(secrets.choice(string.digits) for _ in range(6))
+        pairing_code = _generate_pairing_code()
 
         fridge = Fridge(
             kiosk_id=kiosk_id,
@@ -91,36 +135,135 @@ class FridgeService:
         return {
             "kiosk_id": kiosk_id,
             "pairing_code": pairing_code,
-            "expires_in_minutes": settings.DEVICE_PAIRING_TIMEOUT_MINUTES,
+            "expires_in_minutes": _PAIRING_TTL_MINUTES,
             "is_paired": False,
         }
 
     @transactional
     def update_heartbeat(self, kiosk_id: str):
-        fridge = self.db.query(Fridge).filter(Fridge.kiosk_id == kiosk_id).first()
+        # Avec Redis, le heartbeat n'est écrit en base que par flush_heartbeats
+        client = get_redis()
+        if client is not None:
+            try:
+                client.set(
+                    f"{HEARTBEAT_KEY_PREFIX}{kiosk_id}",
+                    datetime.utcnow().isoformat(),
+                    ex=HEARTBEAT_TTL_SECONDS,
+                )
+                return
+            except redis.RedisError as e:
+                logger.warning(f"Heartbeat cache failed for kiosk {kiosk_id}: {e}")
+
+        # Horodatage généré par la base, sans SELECT préalable
+        self.db.execute(
+            update(Fridge)
+            .where(Fridge.kiosk_id == kiosk_id)
+            .values(last_heartbeat=utc_now())
+            .execution_options(synchronize_session=False)
+        )
+
+    def _get_cached_heartbeat(self, kiosk_id: str) -> Optional[datetime]:
+        client = get_redis()
+        if client is None:
+            return None
+
+        try:
+            raw = client.get(f"{HEARTBEAT_KEY_PREFIX}{kiosk_id}")
+        except redis.RedisError as e:
+            logger.warning(f"Heartbeat cache read failed for kiosk {kiosk_id}: {e}")
+            return None
+
+        return datetime.fromisoformat(raw.decode()) if raw is not None else None
+
+    def flush_heartbeats(self) -> int:
+        """Reporte en base les heartbeats mis en cache dans Redis"""
+        client = get_redis()
+        if client is None:
+            return 0
+
+        heartbeats: Dict[str, datetime] = {}
+        try:
+            keys = list(
+                client.scan_iter(
+                    match=f"{HEARTBEAT_KEY_PREFIX}*", count=HEARTBEAT_FLUSH_BATCH_SIZE
+                )
+            )
+            for start in range(0, len(keys), HEARTBEAT_FLUSH_BATCH_SIZE):
+                batch = keys[start : start + HEARTBEAT_FLUSH_BATCH_SIZE]
+                # GETDEL : chaque heartbeat n'est reporté qu'une seule fois
+                pipe = client.pipeline(transaction=False)
+                for key in batch:
+                    pipe.getdel(key)
+                for key, raw in zip(batch, pipe.execute()):
+                    if raw is not None:
+                        kiosk_id = key.decode()[len(HEARTBEAT_KEY_PREFIX) :]
+                        heartbeats[kiosk_id] = datetime.fromisoformat(raw.decode())
+        except redis.RedisError as e:
+            logger.warning(f"Heartbeat flush skipped: {e}")
+            return 0
+
+        items = list(heartbeats.items())
+        updated = 0
+        for start in range(0, len(items), HEARTBEAT_FLUSH_BATCH_SIZE):
+            batch = dict(items[start : start + HEARTBEAT_FLUSH_BATCH_SIZE])
+            heartbeat = case(batch, value=Fridge.kiosk_id)
+            result = self.db.execute(
+                update(Fridge)
+                .where(Fridge.kiosk_id.in_(batch.keys()))
+                .values(last_heartbeat=heartbeat)
+                .execution_options(synchronize_session=False)
+            )
+            self.db.commit()
+            updated += result.rowcount
+
+        return updated
 
-        if fridge:
-            fridge.last_heartbeat = datetime.utcnow()
-            logger.debug(f"Heartbeat updated for kiosk {kiosk_id}")
+    def expire_pairing_codes(self) -> int:
+        """Libère les codes de pairing expirés des kiosks non pairés"""
+        valid_after = datetime.utcnow() - _PAIRING_TTL
 
-    def get_fridge_status(self, kiosk_id: str) -> Optional[Dict]:
-        fridge = self.db.query(Fridge).filter(Fridge.kiosk_id == kiosk_id).first()
+        result = self.db.execute(
+            update(Fridge)
+            .where(
+                ~Fridge.is_paired,
+                Fridge.pairing_code.isnot(None),
+                Fridge.created_at < valid_after,
+            )
+            .values(pairing_code=None)
+            .execution_options(synchronize_session=False)
+        )
+        self.db.commit()
+
+        return result.rowcount
+
+    def get_fridge_status(
+        self, kiosk_id: str, use_cache: bool = True
+    ) -> Optional[Dict]:
+        cache_key = f"{KIOSK_STATUS_KEY_PREFIX}{kiosk_id}"
+        if use_cache:
+            cached = cache_get(cache_key)
+            if cached is not None:
+                return cached
+
+        fridge = self.db.execute(_kiosk_status_stmt(kiosk_id)).first()
 
         if not fridge:
             return None
 
-        return {
+        last_heartbeat = self._get_cached_heartbeat(kiosk_id) or fridge.last_heartbeat
+
+        status = {
             "kiosk_id": fridge.kiosk_id,
             "is_paired": fridge.is_paired,
             "fridge_id": fridge.id if fridge.is_paired else None,
             "fridge_name": fridge.name if fridge.is_paired else None,
-            "last_heartbeat": (
-                fridge.last_heartbeat.isoformat() if fridge.last_heartbeat else None
-            ),
+            "last_heartbeat": last_heartbeat.isoformat() if last_heartbeat else None,
             "paired_at": fridge.paired_at.isoformat() if fridge.paired_at else None,
         }
 
-    @transactional
+        cache_set(cache_key, status, KIOSK_STATUS_CACHE_TTL_SECONDS)
+        return status
+
     def pair_fridge(
         self,
         pairing_code: str,
@@ -128,14 +271,40 @@ class FridgeService:
         fridge_name: str = "Mon Frigo",
         fridge_location: Optional[str] = None,
     ) -> Optional[Dict]:
-        timeout_minutes = settings.DEVICE_PAIRING_TIMEOUT_MINUTES
-        valid_after = datetime.utcnow() - timedelta(minutes=timeout_minutes)
+        result = self._claim_pairing_code(
+            pairing_code, user_id, fridge_name, fridge_location
+        )
+
+        if not result:
+            return None
+
+        cache_delete(f"{KIOSK_STATUS_KEY_PREFIX}{result['kiosk_id']}")
+
+        # Signature du token hors transaction : le verrou est déjà relâché
+        result["access_token"] = create_access_token(
+            {
+                "sub": str(user_id),
+                "fridge_id": result["fridge_id"],
+            }
+        )
+
+        return result
+
+    @transactional
+    def _claim_pairing_code(
+        self,
+        pairing_code: str,
+        user_id: int,
+        fridge_name: str = "Mon Frigo",
+        fridge_location: Optional[str] = None,
+    ) -> Optional[Dict]:
+        valid_after = datetime.utcnow() - _PAIRING_TTL
 
         fridge = (
             self.db.query(Fridge)
             .filter(
                 Fridge.pairing_code == pairing_code,
-                Fridge.is_paired,
+                ~Fridge.is_paired,
                 Fridge.created_at >= valid_after,
             )
             .first()
@@ -153,20 +322,6 @@ class FridgeService:
         fridge.pairing_code = None
         fridge.last_heartbeat = datetime.utcnow()
 
-        if not fridge.config:
-            fridge.config = {
-                "expiry_warning_days": 3,
-                "lost_item_threshold_hours": 72,
-                "low_stock_threshold": 2.0,
-            }
-
-        access_token = create_access_token(
-            {
-                "sub": str(user_id),
-                "fridge_id": fridge.id,
-            }
-        )
-
         logger.info(f"Fridge paired: {fridge.id} to user {user_id}")
 
         return {
@@ -174,28 +329,44 @@ class FridgeService:
             "fridge_name": fridge.name,
             "fridge_location": fridge.location,
             "kiosk_id": fridge.kiosk_id,
-            "access_token": access_token,
         }
 
     @transactional
     def unpair_fridge(self, fridge_id: int, user_id: int) -> bool:
-        fridge = self.db.query(Fridge).filter(Fridge.id == fridge_id).first()
+        unpaired = self.db.execute(
+            update(Fridge)
+            .where(Fridge.id == fridge_id, Fridge.user_id == user_id)
+            .values(
+                is_paired=False,
+                user_id=None,
+                paired_at=None,
+                name="Mon Frigo",
+                location=None,
+                pairing_code=_generate_pairing_code(),
+            )
+            .returning(Fridge.kiosk_id)
+        ).first()
 
-        if not fridge:
+        if not unpaired:
             return False
 
-        fridge.is_paired = False
-        fridge.user_id = None
-        fridge.paired_at = None
-        fridge.name = "Mon Frigo"
-        fridge.location = None
-
-        fridge.pairing_code = "".join(secrets.choice(string.digits) for _ in range(6))
-
-        self.db.query(InventoryItem).filter(
-            InventoryItem.fridge_id == fridge_id
-        ).delete()
-        self.db.query(Alert).filter(Alert.fridge_id == fridge_id).delete()
+        # Alertes et inventaire supprimés en une seule instruction (CTE DELETE)
+        deleted_alerts = (
+            delete(Alert)
+            .where(Alert.fridge_id == fridge_id)
+            .returning(Alert.id)
+            .cte("deleted_alerts")
+        )
+        self.db.execute(
+            delete(InventoryItem)
+            .where(InventoryItem.fridge_id == fridge_id)
+            .add_cte(deleted_alerts),
+            execution_options={"synchronize_session": False},
+        )
+        # Caches invalidés au commit : une lecture concurrente ne les remplit pas avant
+        delete_on_commit(self.db, [f"{KIOSK_STATUS_KEY_PREFIX}{unpaired.kiosk_id}"])
+        mark_alerts_changed(self.db, [fridge_id])
+        mark_inventory_changed(self.db, [fridge_id])
 
         logger.info(f"Fridge unpaired: {fridge_id}")
 
@@ -204,15 +375,22 @@ class FridgeService:
     def get_fridge_by_id(
         self, fridge_id: int, user_id: Optional[int] = None
     ) -> Optional[Fridge]:
-        query = self.db.query(Fridge).filter(Fridge.id == fridge_id)
+        stmt = lambda_stmt(lambda: select(Fridge))
+        stmt += lambda s: s.where(Fridge.id == fridge_id)
 
         if user_id:
-            query = query.filter(Fridge.user_id == user_id)
+            stmt += lambda s: s.where(Fridge.user_id == user_id)
 
-        return query.first()
+        return self.db.execute(stmt).scalars().first()
 
     def get_user_fridges(self, user_id: int) -> List[Fridge]:
-        return self.db.query(Fridge).filter(Fridge.user_id == user_id).all()
+        # FridgeResponse n'expose que des colonnes : aucun chargement paresseux
+        return (
+            self.db.query(Fridge)
+            .options(raiseload("*"))
+            .filter(Fridge.user_id == user_id)
+            .all()
+        )
 
     @transactional
     def update_fridge(
@@ -255,64 +433,79 @@ class FridgeService:
         return True
 
     def get_fridge_statistics(self, fridge_id: int) -> Dict[str, Any]:
-        fridge = self.get_fridge_by_id(fridge_id)
-
-        if not fridge:
-            return {}
+        return self._build_fridge_statistics(fridge_id)
 
-        active_items = (
-            self.db.query(InventoryItem)
-            .filter(InventoryItem.fridge_id == fridge_id, InventoryItem.quantity > 0)
-            .count()
+    def get_fridge_summary(self, fridge_id: int) -> Dict[str, Any]:
+        return self._build_fridge_statistics(fridge_id, include_critical_alerts=True)
+
+    def _build_fridge_statistics(
+        self, fridge_id: int, include_critical_alerts: bool = False
+    ) -> Dict[str, Any]:
+        month_ago = datetime.now(_UTC).replace(tzinfo=None) - timedelta(days=30)
+
+        # Agrégats à une ligne, joints au frigo : un seul aller-retour
+        inventory = (
+            select(
+                func.count(InventoryItem.id).label("active_items"),
+                func.coalesce(
+                    func.sum(
+                        InventoryItem.extra_data["price"].as_float()
+                        * InventoryItem.quantity
+                    ),
+                    0,
+                ).label("total_value"),
+            )
+            .where(InventoryItem.fridge_id == fridge_id, InventoryItem.quantity > 0)
+            .subquery()
         )
-
-        pending_alerts = (
-            self.db.query(Alert)
-            .filter(Alert.fridge_id == fridge_id, Alert.status == "pending")
-            .count()
+        alerts = (
+            select(
+                func.count(Alert.id).label("pending"),
+                func.count(Alert.id)
+                .filter(Alert.type.in_(["EXPIRED", "EXPIRY_SOON"]))
+                .label("critical"),
+            )
+            .where(Alert.fridge_id == fridge_id, Alert.status == "pending")
+            .subquery()
         )
-
-        month_ago = datetime.utcnow() - timedelta(days=30)
-        recent_events = (
-            self.db.query(Event)
-            .filter(Event.fridge_id == fridge_id, Event.created_at >= month_ago)
-            .count()
+        events = (
+            select(func.count(Event.id).label("recent_events"))
+            .where(Event.fridge_id == fridge_id, Event.created_at >= month_ago)
+            .subquery()
         )
 
-        total_value = 0
-        items = (
-            self.db.query(InventoryItem)
-            .filter(InventoryItem.fridge_id == fridge_id, InventoryItem.quantity > 0)
-            .all()
+        row = (
+            self.db.query(
+                Fridge.name,
+                Fridge.created_at,
+                inventory.c.active_items,
+                inventory.c.total_value,
+                alerts.c.pending,
+                alerts.c.critical,
+                events.c.recent_events,
+            )
+            .select_from(Fridge)
+            .join(inventory, true())
+            .join(alerts, true())
+            .join(events, true())
+            .filter(Fridge.id == fridge_id)
+            .first()
         )
 
-        for item in items:
-            if item.extra_data and "price" in item.extra_data:
-                total_value += item.extra_data["price"] * item.quantity
+        if not row:
+            return {}
 
-        return {
+        stats = {
             "fridge_id": fridge_id,
-            "name": fridge.name,
-            "active_items": active_items,
-            "pending_alerts": pending_alerts,
-            "recent_events": recent_events,
-            "estimated_value": round(total_value, 2),
-            "created_at": fridge.created_at.isoformat(),
+            "name": row.name,
+            "active_items": row.active_items,
+            "pending_alerts": row.pending,
+            "recent_events": row.recent_events,
+            "estimated_value": round(row.total_value, 2),
+            "created_at": row.created_at.isoformat(),
         }
 
-    def get_fridge_summary(self, fridge_id: int) -> Dict[str, Any]:
-        stats = self.get_fridge_statistics(fridge_id)
-
-        critical_alerts = (
-            self.db.query(Alert)
-            .filter(
-                Alert.fridge_id == fridge_id,
-                Alert.status == "pending",
-                Alert.type.in_(["EXPIRED", "EXPIRY_SOON"]),
-            )
-            .count()
-        )
-
-        stats["critical_alerts"] = critical_alerts
+        if include_critical_alerts:
+            stats["critical_alerts"] = row.critical
 
         return stats
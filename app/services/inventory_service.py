@@ -1,20 +1,105 @@
+from sqlalchemy import (
+    Float,
+    Integer,
+    Row,
+    case,
+    column,
+    delete,
+    func,
+    insert,
+    lambda_stmt,
+    select,
+    update,
+    values,
+)
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from typing import Optional, List
+from typing import Dict, Optional, List, Tuple
 from datetime import datetime, date, timedelta
+from collections import namedtuple
 import logging
 
+from app.core.cache import (
+    cache_get,
+    cache_set,
+    delete_on_commit,
+    invalidate_on_flush,
+)
+from app.core.database import utc_now
 from app.middleware.transaction_handler import transactional
 from app.models.inventory import InventoryItem
 from app.models.product import Product
 from app.models.event import Event
+from app.models.alert import Alert
+from app.services.alert_service import mark_alerts_changed
 
 logger = logging.getLogger(__name__)
 
+PRODUCT_CACHE_TTL_SECONDS = 3600
+
+QUANTITY_CHECK_NAME = "ck_inventory_quantity_nonneg"
+
+# Champs du produit lus par l'inventaire, mis en cache dans Redis
+CachedProduct = namedtuple(
+    "CachedProduct", ("id", "name", "default_unit", "shelf_life_days", "extra_data")
+)
+
+
+def product_cache_key(product_id: int) -> str:
+    return f"product:{product_id}"
+
+
+# Les champs de fraîcheur dépendent de la date : le TTL borne leur retard
+ACTIVE_ITEMS_CACHE_TTL_SECONDS = 60
+
+
+def active_items_cache_key(fridge_id: int) -> str:
+    return f"fridge:{fridge_id}:active"
+
+
+def mark_inventory_changed(session: Session, fridge_ids) -> None:
+    # Caches invalidés au commit (écritures Core hors flush ORM)
+    delete_on_commit(session, (active_items_cache_key(fid) for fid in fridge_ids))
+
+
+invalidate_on_flush(
+    InventoryItem, lambda item: [active_items_cache_key(item.fridge_id)]
+)
+
+
+def _active_items_stmt(fridge_id: int):
+    # Statement mis en cache par SQLAlchemy : pas de reconstruction par appel
+    stmt = lambda_stmt(lambda: select(InventoryItem))
+    stmt += lambda s: s.where(
+        InventoryItem.fridge_id == fridge_id, InventoryItem.quantity > 0
+    )
+    return stmt
+
 
 class InventoryService:
     def __init__(self, db: Session):
         self.db = db
 
+    def _get_product(self, product_id: int) -> Optional[CachedProduct]:
+        key = product_cache_key(product_id)
+        cached = cache_get(key)
+        if cached is not None:
+            return CachedProduct(**cached)
+
+        product = self.db.get(Product, product_id)
+        if not product:
+            return None
+
+        cached = CachedProduct(
+            *(getattr(product, field) for field in CachedProduct._fields)
+        )
+        cache_set(key, cached._asdict(), PRODUCT_CACHE_TTL_SECONDS)
+        return cached
+
+    def _log_event(self, **values):
+        # INSERT Core : pas de passage par l'unit of work pour le journal
+        self.db.execute(insert(Event), [values])
+
     @transactional
     def add_item(
         self,
@@ -25,7 +110,7 @@ class InventoryService:
         expiry_date: Optional[date] = None,
         source: str = "manual",
     ) -> InventoryItem:
-        product = self.db.query(Product).filter(Product.id == product_id).first()
+        product = self._get_product(product_id)
 
         if not product:
             raise ValueError(f"Product {product_id} not found")
@@ -50,7 +135,7 @@ class InventoryService:
         self.db.add(item)
         self.db.flush()
 
-        event = Event(
+        self._log_event(
             fridge_id=fridge_id,
             inventory_item_id=item.id,
             type="ITEM_ADDED",
@@ -62,30 +147,30 @@ class InventoryService:
                 "source": source,
             },
         )
-        self.db.add(event)
 
-        self.db.commit()
-        self.db.refresh(item)
-
-        logger.info(f"Item added to inventory: {item.id} - {product.name}")
+        logger.info("Item added to inventory: %s - %s", item.id, product.name)
         return item
 
     @transactional
     def update_quantity(
         self, item_id: int, new_quantity: float, reason: str = "manual_update"
     ) -> Optional[InventoryItem]:
-        item = self.db.query(InventoryItem).filter(InventoryItem.id == item_id).first()
+        item = self.db.get(InventoryItem, item_id)
 
         if not item:
             return None
 
-        if new_quantity < 0:
-            raise ValueError("Quantity cannot be negative (RG9)")
-
         old_quantity = item.quantity
         item.quantity = new_quantity
 
-        event = Event(
+        try:
+            self.db.flush()
+        except IntegrityError as e:
+            if QUANTITY_CHECK_NAME in str(e.orig):
+                raise ValueError("Quantity cannot be negative (RG9)") from e
+            raise
+
+        self._log_event(
             fridge_id=item.fridge_id,
             inventory_item_id=item.id,
             type="QUANTITY_UPDATED",
@@ -95,120 +180,246 @@ class InventoryService:
                 "reason": reason,
             },
         )
-        self.db.add(event)
-
-        self.db.commit()
-        self.db.refresh(item)
 
         return item
 
     def consume_item(
         self, item_id: int, quantity_consumed: float
     ) -> Optional[InventoryItem]:
-        item = self.db.query(InventoryItem).filter(InventoryItem.id == item_id).first()
+        # Décrément atomique : RG9 dans le WHERE, RG8 dans le SET
+        item = self.db.scalars(
+            update(InventoryItem)
+            .where(
+                InventoryItem.id == item_id,
+                InventoryItem.quantity >= quantity_consumed,
+            )
+            .values(
+                quantity=InventoryItem.quantity - quantity_consumed,
+                open_date=case(
+                    (
+                        InventoryItem.quantity > quantity_consumed,
+                        func.coalesce(InventoryItem.open_date, func.current_date()),
+                    ),
+                    else_=InventoryItem.open_date,
+                ),
+            )
+            .returning(InventoryItem),
+            execution_options={"synchronize_session": False},
+        ).first()
 
         if not item:
-            return None
-
-        new_quantity = item.quantity - quantity_consumed
-        if new_quantity < 0:
+            current = self.db.get(InventoryItem, item_id)
+            if not current:
+                return None
             raise ValueError(
-                f"Cannot consume {quantity_consumed} {item.unit}. "
-                f"Only {item.quantity} {item.unit} available (RG9)"
+                f"Cannot consume {quantity_consumed} {current.unit}. "
+                f"Only {current.quantity} {current.unit} available (RG9)"
             )
 
-        if new_quantity > 0 and not item.open_date:
-            item.open_date = date.today()
-            logger.info(f"Open date set for item {item_id} (RG8)")
-
-        item.quantity = new_quantity
-
-        event = Event(
+        self._log_event(
             fridge_id=item.fridge_id,
             inventory_item_id=item.id,
             type="ITEM_CONSUMED",
             payload={
                 "quantity_consumed": quantity_consumed,
                 "unit": item.unit,
-                "remaining": new_quantity,
+                "remaining": item.quantity,
                 "open_date_set": item.open_date.isoformat() if item.open_date else None,
             },
         )
-        self.db.add(event)
 
+        logger.info("Item consumed: %s - %s %s", item_id, quantity_consumed, item.unit)
+        mark_inventory_changed(self.db, [item.fridge_id])
         self.db.commit()
-        self.db.refresh(item)
 
-        logger.info(f"Item consumed: {item_id} - {quantity_consumed} {item.unit}")
         return item
 
+    @transactional
+    def consume_items_bulk(
+        self,
+        items: List[Tuple[int, float]],
+        event_payloads: Optional[List[dict]] = None,
+    ) -> List[Row]:
+        """Décrémente plusieurs items en un seul UPDATE ... FROM (VALUES ...)
+
+        Un événement ITEM_CONSUMED par ligne de `items` (même item répété compris) ;
+        event_payloads complète, ligne par ligne, le payload de ces événements.
+        """
+        totals: Dict[int, float] = {}
+        for item_id, quantity_consumed in items:
+            totals[item_id] = totals.get(item_id, 0) + quantity_consumed
+
+        if not totals:
+            return []
+
+        consumed = values(
+            column("id", Integer), column("q", Float), name="consumed"
+        ).data(list(totals.items()))
+
+        rows = self.db.execute(
+            update(InventoryItem)
+            .where(
+                InventoryItem.id == consumed.c.id,
+                InventoryItem.quantity >= consumed.c.q,
+            )
+            .values(
+                quantity=InventoryItem.quantity - consumed.c.q,
+                # RG8 : date d'ouverture posée si l'item n'est pas épuisé
+                open_date=case(
+                    (
+                        InventoryItem.quantity > consumed.c.q,
+                        func.coalesce(InventoryItem.open_date, func.current_date()),
+                    ),
+                    else_=InventoryItem.open_date,
+                ),
+            )
+            .returning(
+                InventoryItem.id,
+                InventoryItem.fridge_id,
+                InventoryItem.quantity,
+                InventoryItem.unit,
+                InventoryItem.open_date,
+                consumed.c.q,
+            ),
+            execution_options={"synchronize_session": False},
+        ).all()
+
+        if len(rows) != len(totals):
+            missing = sorted(set(totals) - {row.id for row in rows})
+            raise ValueError(
+                f"Cannot consume items {missing}: not found or insufficient "
+                f"quantity (RG9)"
+            )
+
+        rows_by_id = {row.id: row for row in rows}
+        remaining = {row.id: row.quantity + row.q for row in rows}
+        events = []
+        for index, (item_id, quantity_consumed) in enumerate(items):
+            row = rows_by_id[item_id]
+            remaining[item_id] -= quantity_consumed
+            events.append(
+                {
+                    "fridge_id": row.fridge_id,
+                    "inventory_item_id": item_id,
+                    "type": "ITEM_CONSUMED",
+                    "payload": {
+                        **(event_payloads[index] if event_payloads else {}),
+                        "quantity_consumed": quantity_consumed,
+                        "unit": row.unit,
+                        "remaining": remaining[item_id],
+                        "open_date_set": (
+                            row.open_date.isoformat() if row.open_date else None
+                        ),
+                    },
+                }
+            )
+        self.db.execute(insert(Event), events)
+
+        mark_inventory_changed(self.db, (row.fridge_id for row in rows))
+
+        logger.info("Items consumed in bulk: %s", len(rows))
+        return rows
+
     def update_last_seen(
         self, item_id: int, seen_at: Optional[datetime] = None
     ) -> Optional[InventoryItem]:
-        item = self.db.query(InventoryItem).filter(InventoryItem.id == item_id).first()
+        item = self.db.scalars(
+            update(InventoryItem)
+            .where(InventoryItem.id == item_id)
+            .values(last_seen_at=seen_at or utc_now())
+            .returning(InventoryItem)
+        ).first()
 
         if not item:
             return None
 
-        item.last_seen_at = seen_at or datetime.utcnow()
+        mark_inventory_changed(self.db, [item.fridge_id])
         self.db.commit()
-        self.db.refresh(item)
 
         return item
 
     def get_active_items(self, fridge_id: int) -> List[InventoryItem]:
-        return (
-            self.db.query(InventoryItem)
-            .filter(InventoryItem.fridge_id == fridge_id, InventoryItem.quantity > 0)
-            .all()
+        return self.db.scalars(_active_items_stmt(fridge_id)).all()
+
+    def list_active_rows(self, fridge_id: int) -> List[Row]:
+        """Items actifs en tuples de colonnes (lecture seule, sans hydratation ORM)"""
+        stmt = lambda_stmt(
+            lambda: select(
+                *InventoryItem.__table__.c,
+                Product.name,
+                Product.category,
+                Product.tags,
+                Product.shelf_life_days,
+            ).outerjoin(Product, InventoryItem.product_id == Product.id)
         )
+        stmt += lambda s: s.where(
+            InventoryItem.fridge_id == fridge_id, InventoryItem.quantity > 0
+        )
+        return self.db.execute(stmt).all()
 
     def get_expiring_items(self, fridge_id: int, days: int = 3) -> List[InventoryItem]:
-        expiry_threshold = date.today() + timedelta(days=days)
-
-        return (
-            self.db.query(InventoryItem)
-            .filter(
-                InventoryItem.fridge_id == fridge_id,
-                InventoryItem.quantity > 0,
-                InventoryItem.expiry_date <= expiry_threshold,
-                InventoryItem.expiry_date >= date.today(),
-            )
-            .all()
+        today = date.today()
+        expiry_threshold = today + timedelta(days=days)
+
+        stmt = _active_items_stmt(fridge_id)
+        stmt += lambda s: s.where(
+            InventoryItem.expiry_date <= expiry_threshold,
+            InventoryItem.expiry_date >= today,
         )
+        return self.db.scalars(stmt).all()
 
     def get_expired_items(self, fridge_id: int) -> List[InventoryItem]:
-        return (
-            self.db.query(InventoryItem)
-            .filter(
-                InventoryItem.fridge_id == fridge_id,
-                InventoryItem.quantity > 0,
-                InventoryItem.expiry_date < date.today(),
+        today = date.today()
+
+        stmt = _active_items_stmt(fridge_id)
+        stmt += lambda s: s.where(InventoryItem.expiry_date < today)
+        return self.db.scalars(stmt).all()
+
+    def remove_item(self, item_id: int, reason: str = "user_delete") -> bool:
+        # Alertes détachées (et résolues si en attente) avant le CASCADE
+        pending = Alert.status == "pending"
+        self.db.execute(
+            update(Alert)
+            .where(Alert.inventory_item_id == item_id)
+            .values(
+                inventory_item_id=None,
+                status=case((pending, "resolved"), else_=Alert.status),
+                resolved_at=case((pending, utc_now()), else_=Alert.resolved_at),
             )
-            .all()
+            .execution_options(synchronize_session=False)
         )
 
-    def remove_item(self, item_id: int, reason: str = "user_delete") -> bool:
-        item = self.db.query(InventoryItem).filter(InventoryItem.id == item_id).first()
+        removed = self.db.execute(
+            delete(InventoryItem)
+            .where(InventoryItem.id == item_id)
+            .returning(
+                InventoryItem.fridge_id,
+                InventoryItem.product_id,
+                InventoryItem.quantity,
+                InventoryItem.unit,
+            )
+            .execution_options(synchronize_session="fetch")
+        ).first()
 
-        if not item:
+        if not removed:
             return False
 
-        event = Event(
-            fridge_id=item.fridge_id,
-            inventory_item_id=item.id,
+        # Le lien vers l'item supprimé serait de toute façon remis à NULL
+        self._log_event(
+            fridge_id=removed.fridge_id,
+            inventory_item_id=None,
             type="ITEM_REMOVED",
             payload={
-                "product_id": item.product_id,
-                "quantity": item.quantity,
-                "unit": item.unit,
+                "product_id": removed.product_id,
+                "quantity": removed.quantity,
+                "unit": removed.unit,
                 "reason": reason,
             },
         )
-        self.db.add(event)
 
-        self.db.delete(item)
+        mark_inventory_changed(self.db, [removed.fridge_id])
+        mark_alerts_changed(self.db, [removed.fridge_id])
         self.db.commit()
 
-        logger.info(f"Item removed: {item_id} - {reason}")
+        logger.info("Item removed: %s - %s", item_id, reason)
         return True
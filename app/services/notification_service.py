@@ -1,6 +1,13 @@
-from typing import List, Dict, Any, Optional
-from sqlalchemy.orm import Session
+from typing import Iterator, List, Dict, Any, Optional, Tuple
+from sqlalchemy import Row, func, select
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.orm.attributes import flag_modified
+from collections import defaultdict
+from contextlib import contextmanager
 from datetime import datetime
+from functools import lru_cache
+from html import escape
+import queue
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
@@ -9,82 +16,65 @@ import logging
 from app.models.user import User
 from app.models.alert import Alert
 from app.models.inventory import InventoryItem
+from app.models.product import Product
 from app.models.fridge import Fridge
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
 
-class NotificationService:
-    def __init__(self, db: Session):
-        self.db = db
-
-    def send_email_notification(
-        self, user_email: str, subject: str, body: str, html_body: Optional[str] = None
-    ) -> bool:
-        try:
-            smtp_host = getattr(settings, "SMTP_HOST", "smtp.gmail.com")
-            smtp_port = getattr(settings, "SMTP_PORT", 587)
-            smtp_user = getattr(settings, "SMTP_USER", None)
-            smtp_password = getattr(settings, "SMTP_PASSWORD", None)
-            from_email = getattr(settings, "SMTP_FROM_EMAIL", "noreply@smartfridge.com")
-
-            if not smtp_user or not smtp_password:
-                logger.warning("SMTP credentials not configured")
-                return False
-
-            msg = MIMEMultipart("alternative")
-            msg["Subject"] = subject
-            msg["From"] = from_email
-            msg["To"] = user_email
-
-            text_part = MIMEText(body, "plain", "utf-8")
-            msg.attach(text_part)
-
-            if html_body:
-                html_part = MIMEText(html_body, "html", "utf-8")
-                msg.attach(html_part)
-
-            with smtplib.SMTP(smtp_host, smtp_port) as server:
-                server.starttls()
-                server.login(smtp_user, smtp_password)
-                server.send_message(msg)
-
-            logger.info(f"Email sent successfully to {user_email}")
-            return True
-
-        except Exception as e:
-            logger.error(f"Failed to send email to {user_email}: {e}")
-            return False
-
-    def send_alert_email(self, alert: Alert, user: User) -> bool:
-        subject = self._get_alert_email_subject(alert)
-        body = self._get_alert_email_body(alert)
-        html_body = self._get_alert_email_html(alert)
-
-        return self.send_email_notification(
-            user_email=user.email, subject=subject, body=body, html_body=html_body
-        )
-
-    def _get_alert_email_subject(self, alert: Alert) -> str:
-        subjects = {
-            "EXPIRY_SOON": "Produits à consommer rapidement",
-            "EXPIRED": "Produits périmés dans votre frigo",
-            "LOST_ITEM": "Produits non détectés récemment",
-            "LOW_STOCK": "Stock faible",
-        }
-        return subjects.get(alert.type, "📬 Alerte Smart Fridge")
-
-    def _get_alert_email_body(self, alert: Alert) -> str:
-        return f"""
+SMTP_POOL_SIZE = 5
+# Limite de tokens par appel send_each_for_multicast
+FCM_MULTICAST_MAX_TOKENS = 500
+# Les fournisseurs limitent le nombre de messages par connexion
+SMTP_MAX_MESSAGES_PER_CONNECTION = 100
+# Un lot d'au moins 30 emails est abandonné dès qu'un tiers a échoué
+EMAIL_BATCH_ABORT_MIN_SIZE = 30
+EMAIL_BATCH_ABORT_FAILURE_RATIO = 3
+
+# (destinataire, sujet, texte, html)
+EmailMessageTuple = Tuple[str, str, str, Optional[str]]
+# (titre, corps, données)
+PushNotificationTuple = Tuple[str, str, Dict[str, Any]]
+# (user_id, email, alertes) : lignes RETURNING, lisibles hors session
+AlertNotification = Tuple[int, str, List[Row]]
+
+
+ALERT_EMAIL_SUBJECTS = {
+    "EXPIRY_SOON": "Produits à consommer rapidement",
+    "EXPIRED": "Produits périmés dans votre frigo",
+    "LOST_ITEM": "Produits non détectés récemment",
+    "LOW_STOCK": "Stock faible",
+}
+ALERT_EMAIL_ICONS = {
+    "EXPIRY_SOON": "⚠️",
+    "EXPIRED": "🚫",
+    "LOST_ITEM": "🔍",
+    "LOW_STOCK": "📉",
+}
+ALERT_PUSH_TITLES = {
+    "EXPIRY_SOON": "Produits à consommer",
+    "EXPIRED": "Produits périmés",
+    "LOST_ITEM": "Produit non détecté",
+    "LOW_STOCK": "Stock faible",
+}
+INVENTORY_PUSH_TITLES = {
+    "added": "Produit ajouté",
+    "updated": "Produit modifié",
+    "consumed": "Produit consommé",
+    "removed": "Produit retiré",
+}
+
+# Gabarits précompilés (str.format_map), comme dans alert_service
+ALERT_EMAIL_TEXT_TMPL = """
             Bonjour,
 
             Vous avez une nouvelle alerte concernant votre réfrigérateur :
 
-            {alert.message}
+            {message}
 
-            Type d'alerte : {alert.type}
-            Date : {alert.created_at.strftime("%d/%m/%Y %H:%M")}
+            Type d'alerte : {type}
+            Date : {date}
 
             Connectez-vous à votre application Smart Fridge pour plus de détails.
 
@@ -92,16 +82,7 @@ class NotificationService:
             L'équipe Smart Fridge
         """
 
-    def _get_alert_email_html(self, alert: Alert) -> str:
-        icon_map = {
-            "EXPIRY_SOON": "⚠️",
-            "EXPIRED": "🚫",
-            "LOST_ITEM": "🔍",
-            "LOW_STOCK": "📉",
-        }
-        icon = icon_map.get(alert.type, "📬")
-
-        return f"""
+ALERT_EMAIL_HTML_TMPL = """
             <!DOCTYPE html>
             <html>
             <head>
@@ -127,14 +108,14 @@ class NotificationService:
                     </div>
                     <div class="content">
                         <div class="alert-box">
-                            <h2 style="margin-top: 0;">{alert.type.replace("_", " ").title()}</h2>
-                            <p style="font-size: 16px;">{alert.message}</p>
+                            <h2 style="margin-top: 0;">{title}</h2>
+                            <p style="font-size: 16px;">{message}</p>
                             <p style="color: #666; font-size: 14px;">
-                                Date : {alert.created_at.strftime("%d/%m/%Y à %H:%M")}
+                                Date : {date}
                             </p>
                         </div>
                         <p>Consultez votre application pour gérer cette alerte et voir les détails complets.</p>
-                        <a href="https://smartfridge.app/alerts/{alert.id}" class="button">
+                        <a href="https://smartfridge.app/alerts/{alert_id}" class="button">
                             Voir l'alerte
                         </a>
                     </div>
@@ -146,57 +127,391 @@ class NotificationService:
             </html>
         """
 
-    def send_daily_summary_email(self, user: User, fridge_id: int) -> bool:
-        fridge = self.db.query(Fridge).filter(Fridge.id == fridge_id).first()
-        if not fridge:
+DAILY_SUMMARY_TMPL = """
+            Bonjour {name},
+
+            Voici le résumé quotidien de votre frigo "{fridge_name}" :
+
+                    - Articles en stock : {inventory_count}
+                    - Alertes en attente : {alert_count}
+
+            {separator}
+            ALERTES EN ATTENTE :
+            {separator}
+
+        {alerts}
+
+            {separator}
+
+            Consultez votre application pour plus de détails.
+
+            Bonne journée !
+            L'équipe Smart Fridge
+        """
+
+
+class _SmtpSession:
+    """Connexion SMTP ouverte au premier envoi (STARTTLS + LOGIN) puis réutilisée"""
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        user: str,
+        password: str,
+        max_messages: int = SMTP_MAX_MESSAGES_PER_CONNECTION,
+    ):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.max_messages = max_messages
+        self.server: Optional[smtplib.SMTP] = None
+        self.messages_sent = 0
+
+    def send(self, msg: MIMEMultipart) -> None:
+        if self.server is not None:
+            try:
+                self._deliver(msg)
+                return
+            except smtplib.SMTPServerDisconnected:
+                # Connexion inactive fermée par le serveur : on en rouvre une
+                pass
+
+        self._connect()
+        self._deliver(msg)
+
+    def _connect(self) -> None:
+        server = smtplib.SMTP(self.host, self.port)
+        try:
+            server.starttls()
+            server.login(self.user, self.password)
+        except Exception:
+            server.close()
+            raise
+        self.server = server
+
+    def _deliver(self, msg: MIMEMultipart) -> None:
+        try:
+            self.server.send_message(msg)
+        except Exception:
+            # Connexion dans un état inconnu : rouverte au prochain envoi
+            self.close()
+            raise
+
+        self.messages_sent += 1
+        if self.messages_sent >= self.max_messages:
+            self.close()
+
+    def close(self) -> None:
+        if self.server is None:
+            return
+
+        try:
+            self.server.quit()
+        except (smtplib.SMTPException, OSError):
+            self.server.close()
+        self.server = None
+        self.messages_sent = 0
+
+
+class SmtpConnectionPool:
+    """Garde jusqu'à max_size connexions SMTP ouvertes entre les envois"""
+
+    def __init__(
+        self,
+        max_size: int = SMTP_POOL_SIZE,
+        max_messages_per_conn: int = SMTP_MAX_MESSAGES_PER_CONNECTION,
+    ):
+        self.max_messages_per_conn = max_messages_per_conn
+        self._idle: "queue.LifoQueue[_SmtpSession]" = queue.LifoQueue(max_size)
+
+    def acquire(self) -> Optional[_SmtpSession]:
+        smtp_user = getattr(settings, "SMTP_USER", None)
+        smtp_password = getattr(settings, "SMTP_PASSWORD", None)
+
+        if not smtp_user or not smtp_password:
+            return None
+
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return _SmtpSession(
+                getattr(settings, "SMTP_HOST", "smtp.gmail.com"),
+                getattr(settings, "SMTP_PORT", 587),
+                smtp_user,
+                smtp_password,
+                self.max_messages_per_conn,
+            )
+
+    def release(self, session: _SmtpSession) -> None:
+        try:
+            self._idle.put_nowait(session)
+        except queue.Full:
+            # Au-delà de max_size, les connexions en surplus sont fermées
+            session.close()
+
+    def close_all(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+smtp_pool = SmtpConnectionPool()
+
+
+@lru_cache(maxsize=None)
+def _firebase_messaging():
+    """Module messaging de Firebase, initialisé une seule fois par processus"""
+    import firebase_admin
+    from firebase_admin import credentials, messaging
+
+    if not firebase_admin._apps:
+        cred = credentials.Certificate(
+            "smart-fridge-357b0-firebase-adminsdk-fbsvc-e5dbd0f2cb.json"
+        )
+        # L'app garde une session HTTP authentifiée réutilisée par tous les envois
+        firebase_admin.initialize_app(cred)
+        logger.info("Firebase Admin SDK initialized")
+
+    return messaging
+
+
+class NotificationService:
+    def __init__(self, db: Session, pool: Optional[SmtpConnectionPool] = None):
+        self.db = db
+        self.smtp_pool = pool or smtp_pool
+        self._smtp: Optional[_SmtpSession] = None
+
+    @contextmanager
+    def smtp_session(self) -> Iterator[None]:
+        """Garde une connexion du pool pour tous les emails envoyés dans le bloc"""
+        if self._smtp is not None:
+            yield
+            return
+
+        self._smtp = self.smtp_pool.acquire()
+        try:
+            yield
+        finally:
+            if self._smtp is not None:
+                self.smtp_pool.release(self._smtp)
+            self._smtp = None
+
+    def send_email_notification(
+        self, user_email: str, subject: str, body: str, html_body: Optional[str] = None
+    ) -> bool:
+        try:
+            from_email = getattr(settings, "SMTP_FROM_EMAIL", "noreply@smartfridge.com")
+
+            smtp = self._smtp or self.smtp_pool.acquire()
+            if smtp is None:
+                logger.warning("SMTP credentials not configured")
+                return False
+
+            msg = MIMEMultipart("alternative")
+            msg["Subject"] = subject
+            msg["From"] = from_email
+            msg["To"] = user_email
+
+            text_part = MIMEText(body, "plain", "utf-8")
+            msg.attach(text_part)
+
+            if html_body:
+                html_part = MIMEText(html_body, "html", "utf-8")
+                msg.attach(html_part)
+
+            try:
+                smtp.send(msg)
+            finally:
+                if smtp is not self._smtp:
+                    self.smtp_pool.release(smtp)
+
+            logger.info(f"Email sent successfully to {user_email}")
+            return True
+
+        except Exception as e:
+            logger.error(f"Failed to send email to {user_email}: {e}")
             return False
 
-        pending_alerts = (
-            self.db.query(Alert)
-            .filter(Alert.fridge_id == fridge_id, Alert.status == "pending")
-            .all()
+    def send_email_batch(
+        self, messages: List[EmailMessageTuple]
+    ) -> Tuple[int, List[EmailMessageTuple]]:
+        """Envoie (email, sujet, texte, html) sur une seule connexion du pool
+
+        Retourne le nombre d'envois réussis et les messages non tentés si le
+        lot a été abandonné, à renvoyer plus tard.
+        """
+        batch_size = len(messages)
+        sent = failed = 0
+
+        with self.smtp_session():
+            for index, (user_email, subject, body, html_body) in enumerate(messages):
+                if self.send_email_notification(user_email, subject, body, html_body):
+                    sent += 1
+                else:
+                    failed += 1
+
+                # SMTP en panne ou qui rejette : inutile d'insister sur le reste
+                if (
+                    batch_size >= EMAIL_BATCH_ABORT_MIN_SIZE
+                    and failed * EMAIL_BATCH_ABORT_FAILURE_RATIO >= batch_size
+                ):
+                    unsent = messages[index + 1 :]
+                    logger.error(
+                        f"Aborting email batch after {failed} failures: "
+                        f"{len(unsent)} of {batch_size} not attempted"
+                    )
+                    return sent, unsent
+
+        return sent, []
+
+    def send_alert_notifications(self, outbox: List[AlertNotification]) -> None:
+        """Push groupé puis emails des alertes urgentes, sur une connexion SMTP"""
+        try:
+            push_by_user: Dict[int, List[Row]] = defaultdict(list)
+            urgent: List[Tuple[Row, str]] = []
+
+            for user_id, user_email, alerts in outbox:
+                high_priority_alerts = [
+                    a for a in alerts if a.type in ["EXPIRED", "EXPIRY_SOON"]
+                ]
+                # Alertes urgentes seules (push + email) si présentes, sinon tout en push
+                push_by_user[user_id].extend(high_priority_alerts or alerts)
+                urgent.extend((alert, user_email) for alert in high_priority_alerts)
+
+            self.send_alert_push_bulk(push_by_user)
+
+            if urgent:
+                with self.smtp_session():
+                    for alert, user_email in urgent:
+                        self.send_alert_email(alert, user_email)
+
+            logger.info(
+                f"Sent notifications for "
+                f"{sum(len(alerts) for _, _, alerts in outbox)} alerts "
+                f"to {len(push_by_user)} user(s)"
+            )
+
+        except Exception as e:
+            logger.error(f"Failed to send alert notifications: {e}")
+
+    def send_alert_email(self, alert: Alert, user_email: str) -> bool:
+        subject = self._get_alert_email_subject(alert)
+        body = self._get_alert_email_body(alert)
+        html_body = self._get_alert_email_html(alert)
+
+        return self.send_email_notification(
+            user_email=user_email, subject=subject, body=body, html_body=html_body
         )
 
-        inventory_count = (
-            self.db.query(InventoryItem)
-            .filter(InventoryItem.fridge_id == fridge_id, InventoryItem.quantity > 0)
-            .count()
+    def _get_alert_email_subject(self, alert: Alert) -> str:
+        return ALERT_EMAIL_SUBJECTS.get(alert.type, "📬 Alerte Smart Fridge")
+
+    def _get_alert_email_body(self, alert: Alert) -> str:
+        return ALERT_EMAIL_TEXT_TMPL.format_map(
+            {
+                "message": alert.message,
+                "type": alert.type,
+                "date": alert.created_at.strftime("%d/%m/%Y %H:%M"),
+            }
         )
 
-        subject = f"Résumé quotidien - {fridge.name}"
+    def _get_alert_email_html(self, alert: Alert) -> str:
+        icon = ALERT_EMAIL_ICONS.get(alert.type, "📬")
+
+        # Valeurs échappées : le message d'alerte reprend des noms de produits saisis
+        return ALERT_EMAIL_HTML_TMPL.format_map(
+            {
+                "icon": icon,
+                "title": escape(alert.type.replace("_", " ").title()),
+                "message": escape(alert.message),
+                "date": alert.created_at.strftime("%d/%m/%Y à %H:%M"),
+                "alert_id": alert.id,
+            }
+        )
 
-        body = f"""
-            Bonjour {user.name or "cher utilisateur"},
+    def get_daily_summaries(
+        self, fridge_ids: List[int]
+    ) -> Dict[int, Tuple[str, int, List[Row]]]:
+        """Nom, nombre d'articles en stock et alertes en attente, par frigo"""
+        inventory_count = (
+            select(func.count(InventoryItem.id))
+            .where(InventoryItem.fridge_id == Fridge.id, InventoryItem.quantity > 0)
+            .correlate(Fridge)
+            .scalar_subquery()
+        )
+        fridges = self.db.execute(
+            select(Fridge.id, Fridge.name, inventory_count).where(
+                Fridge.id.in_(fridge_ids)
+            )
+        ).all()
 
-            Voici le résumé quotidien de votre frigo "{fridge.name}" :
+        pending_alerts = defaultdict(list)
+        for alert in self.db.execute(
+            select(Alert.fridge_id, Alert.type, Alert.message).where(
+                Alert.fridge_id.in_(fridge_ids), Alert.status == "pending"
+            )
+        ):
+            pending_alerts[alert.fridge_id].append(alert)
 
-                    - Articles en stock : {inventory_count}
-                    - Alertes en attente : {len(pending_alerts)}
+        return {
+            fridge_id: (name, count, pending_alerts[fridge_id])
+            for fridge_id, name, count in fridges
+        }
 
-            {"=" * 50}
-            ALERTES EN ATTENTE :
-            {"=" * 50}
+    def build_daily_summary_email(
+        self, user: User, summary: Tuple[str, int, List[Row]]
+    ) -> EmailMessageTuple:
+        fridge_name, inventory_count, pending_alerts = summary
 
-        """
+        subject = f"Résumé quotidien - {fridge_name}"
 
+        ctx = {
+            "name": user.name or "cher utilisateur",
+            "fridge_name": fridge_name,
+            "inventory_count": inventory_count,
+            "alert_count": len(pending_alerts),
+            "separator": "=" * 50,
+        }
         if pending_alerts:
-            for alert in pending_alerts:
-                body += f"• [{alert.type}] {alert.message}\n"
+            ctx["alerts"] = "".join(
+                f"• [{alert.type}] {alert.message}\n" for alert in pending_alerts
+            )
         else:
-            body += "Aucune alerte en attente. Tout va bien ! \n"
+            ctx["alerts"] = "Aucune alerte en attente. Tout va bien ! \n"
 
-        body += f"""
+        return user.email, subject, DAILY_SUMMARY_TMPL.format_map(ctx), None
 
-            {"=" * 50}
+    def build_daily_summary_push(
+        self, fridge_id: int, summary: Tuple[str, int, List[Row]]
+    ) -> PushNotificationTuple:
+        fridge_name, inventory_count, pending_alerts = summary
 
-            Consultez votre application pour plus de détails.
+        return (
+            f"Résumé quotidien - {fridge_name}",
+            f"{inventory_count} produit(s), "
+            f"{len(pending_alerts)} alerte(s) en attente",
+            {"fridge_id": fridge_id, "action": "open_fridge"},
+        )
 
-            Bonne journée !
-            L'équipe Smart Fridge
-        """
+    def send_daily_summary_email(
+        self,
+        user: User,
+        fridge_id: int,
+        summary: Optional[Tuple[str, int, List[Row]]] = None,
+    ) -> bool:
+        if summary is None:
+            summary = self.get_daily_summaries([fridge_id]).get(fridge_id)
+        if summary is None:
+            return False
+
+        user_email, subject, body, _ = self.build_daily_summary_email(user, summary)
 
         return self.send_email_notification(
-            user_email=user.email, subject=subject, body=body
+            user_email=user_email, subject=subject, body=body
         )
 
     def _sanitize_fcm_data(self, data: Optional[Dict[str, Any]]) -> Dict[str, str]:
@@ -214,19 +529,96 @@ class NotificationService:
 
         return safe_data
 
+    @staticmethod
+    def _push_targets(fridges: List[Fridge]) -> List[Tuple[str, Fridge]]:
+        targets = []
+        for fridge in fridges:
+            fcm_tokens = []
+
+            if fridge.kiosk_metadata:
+                if "fcm_tokens" in fridge.kiosk_metadata:
+                    fcm_tokens = fridge.kiosk_metadata["fcm_tokens"]
+                elif "fcm_token" in fridge.kiosk_metadata:
+                    fcm_tokens = [fridge.kiosk_metadata["fcm_token"]]
+
+            targets.extend((token, fridge) for token in fcm_tokens if token)
+
+        return targets
+
+    def _multicast(
+        self,
+        messaging,
+        targets: List[Tuple[str, Fridge]],
+        title: str,
+        body: str,
+        safe_data: Dict[str, str],
+    ) -> Tuple[int, bool]:
+        """Envoie aux tokens par lots ; retourne (succès, tokens supprimés)"""
+        success_count = 0
+        tokens_removed = False
+
+        # Un seul appel multicast par lot de tokens au lieu d'un envoi par appareil
+        for start in range(0, len(targets), FCM_MULTICAST_MAX_TOKENS):
+            batch = targets[start : start + FCM_MULTICAST_MAX_TOKENS]
+
+            message = messaging.MulticastMessage(
+                notification=messaging.Notification(
+                    title=title,
+                    body=body,
+                ),
+                data=safe_data,
+                tokens=[token for token, _ in batch],
+                android=messaging.AndroidConfig(
+                    priority="high",
+                    notification=messaging.AndroidNotification(
+                        sound="default",
+                        channel_id="smart_fridge_alerts",
+                        color="#3B82F6",
+                    ),
+                ),
+                apns=messaging.APNSConfig(
+                    payload=messaging.APNSPayload(
+                        aps=messaging.Aps(
+                            sound="default",
+                            badge=1,
+                            content_available=True,
+                        ),
+                    ),
+                ),
+            )
+
+            response = messaging.send_each_for_multicast(message)
+            success_count += response.success_count
+
+            for (fcm_token, fridge), result in zip(batch, response.responses):
+                if result.success:
+                    logger.info(
+                        f"Push notification sent to fridge {fridge.id}: "
+                        f"{result.message_id}"
+                    )
+                elif isinstance(result.exception, messaging.UnregisteredError):
+                    logger.warning(
+                        f"Token invalid/expired for fridge {fridge.id}, "
+                        f"removing from database"
+                    )
+
+                    if "fcm_tokens" in fridge.kiosk_metadata:
+                        fridge.kiosk_metadata["fcm_tokens"].remove(fcm_token)
+                        flag_modified(fridge, "kiosk_metadata")
+                        tokens_removed = True
+                else:
+                    logger.error(
+                        f"Failed to send push to fridge {fridge.id}: "
+                        f"{result.exception}"
+                    )
+
+        return success_count, tokens_removed
+
     def send_push_notification(
         self, user_id: int, title: str, body: str, data: Optional[Dict[str, Any]] = None
     ) -> bool:
         try:
-            import firebase_admin
-            from firebase_admin import credentials, messaging
-
-            if not firebase_admin._apps:
-                cred = credentials.Certificate(
-                    "smart-fridge-357b0-firebase-adminsdk-fbsvc-e5dbd0f2cb.json"
-                )
-                firebase_admin.initialize_app(cred)
-                logger.info("Firebase Admin SDK initialized")
+            messaging = _firebase_messaging()
 
             fridges = (
                 self.db.query(Fridge)
@@ -238,70 +630,16 @@ class NotificationService:
                 logger.info(f"No paired fridges found for user {user_id}")
                 return False
 
-            safe_data = self._sanitize_fcm_data(data)
-
-            success_count = 0
-
-            for fridge in fridges:
-                fcm_tokens = []
-
-                if fridge.kiosk_metadata:
-                    if "fcm_tokens" in fridge.kiosk_metadata:
-                        fcm_tokens = fridge.kiosk_metadata["fcm_tokens"]
-                    elif "fcm_token" in fridge.kiosk_metadata:
-                        fcm_tokens = [fridge.kiosk_metadata["fcm_token"]]
-
-                for fcm_token in fcm_tokens:
-                    if not fcm_token:
-                        continue
-
-                    message = messaging.Message(
-                        notification=messaging.Notification(
-                            title=title,
-                            body=body,
-                        ),
-                        data=safe_data,
-                        token=fcm_token,
-                        android=messaging.AndroidConfig(
-                            priority="high",
-                            notification=messaging.AndroidNotification(
-                                sound="default",
-                                channel_id="smart_fridge_alerts",
-                                color="#3B82F6",
-                            ),
-                        ),
-                        apns=messaging.APNSConfig(
-                            payload=messaging.APNSPayload(
-                                aps=messaging.Aps(
-                                    sound="default",
-                                    badge=1,
-                                    content_available=True,
-                                ),
-                            ),
-                        ),
-                    )
+            success_count, tokens_removed = self._multicast(
+                messaging,
+                self._push_targets(fridges),
+                title,
+                body,
+                self._sanitize_fcm_data(data),
+            )
 
-                    try:
-                        response = messaging.send(message)
-                        success_count += 1
-                        logger.info(
-                            f"Push notification sent to fridge {fridge.id}: {response}"
-                        )
-                    except messaging.UnregisteredError:
-                        logger.warning(
-                            f"Token invalid/expired for fridge {fridge.id}, "
-                            f"removing from database"
-                        )
-
-                        if "fcm_tokens" in fridge.kiosk_metadata:
-                            fridge.kiosk_metadata["fcm_tokens"].remove(fcm_token)
-                            from sqlalchemy.orm.attributes import flag_modified
-
-                            flag_modified(fridge, "kiosk_metadata")
-                            self.db.commit()
-
-                    except Exception as e:
-                        logger.error(f"Failed to send push to fridge {fridge.id}: {e}")
+            if tokens_removed:
+                self.db.commit()
 
             return success_count > 0
 
@@ -309,21 +647,11 @@ class NotificationService:
             logger.error(f"Failed to send push notification: {e}", exc_info=True)
             return False
 
-    def send_alert_push(self, alert: Alert, user_id: int) -> bool:
-        title_map = {
-            "EXPIRY_SOON": "Produits à consommer",
-            "EXPIRED": "Produits périmés",
-            "LOST_ITEM": "Produit non détecté",
-            "LOW_STOCK": "Stock faible",
-        }
-
-        title = title_map.get(alert.type, "📬 Nouvelle alerte")
-
-        return self.send_push_notification(
-            user_id=user_id,
-            title=title,
-            body=alert.message,
-            data={
+    def _alert_push(self, alert: Alert) -> PushNotificationTuple:
+        return (
+            ALERT_PUSH_TITLES.get(alert.type, "📬 Nouvelle alerte"),
+            alert.message,
+            {
                 "alert_id": alert.id,
                 "alert_type": alert.type,
                 "fridge_id": alert.fridge_id,
@@ -331,6 +659,72 @@ class NotificationService:
             },
         )
 
+    def send_alert_push(self, alert: Alert, user_id: int) -> bool:
+        title, body, data = self._alert_push(alert)
+
+        return self.send_push_notification(
+            user_id=user_id, title=title, body=body, data=data
+        )
+
+    def send_push_bulk(
+        self, notifications_by_user: Dict[int, List[PushNotificationTuple]]
+    ) -> Dict[int, bool]:
+        """Push pour plusieurs utilisateurs, frigos chargés en une requête"""
+        results = {user_id: False for user_id in notifications_by_user}
+        if not notifications_by_user:
+            return results
+
+        try:
+            messaging = _firebase_messaging()
+
+            fridges_by_user = defaultdict(list)
+            for fridge in (
+                self.db.query(Fridge)
+                .filter(
+                    Fridge.user_id.in_(list(notifications_by_user)), Fridge.is_paired
+                )
+                .all()
+            ):
+                fridges_by_user[fridge.user_id].append(fridge)
+
+            tokens_removed = False
+
+            for user_id, notifications in notifications_by_user.items():
+                fridges = fridges_by_user.get(user_id)
+                if not fridges:
+                    logger.info(f"No paired fridges found for user {user_id}")
+                    continue
+
+                for title, body, data in notifications:
+                    # Recalculés à chaque envoi : les tokens invalides ont été retirés
+                    success_count, removed = self._multicast(
+                        messaging,
+                        self._push_targets(fridges),
+                        title,
+                        body,
+                        self._sanitize_fcm_data(data),
+                    )
+                    results[user_id] = results[user_id] or success_count > 0
+                    tokens_removed = tokens_removed or removed
+
+            if tokens_removed:
+                self.db.commit()
+
+        except Exception as e:
+            logger.error(f"Failed to send bulk push notifications: {e}", exc_info=True)
+
+        return results
+
+    def send_alert_push_bulk(
+        self, alerts_by_user: Dict[int, List[Alert]]
+    ) -> Dict[int, bool]:
+        return self.send_push_bulk(
+            {
+                user_id: [self._alert_push(alert) for alert in alerts]
+                for user_id, alerts in alerts_by_user.items()
+            }
+        )
+
     def send_sms_notification(self, phone_number: str, message: str) -> bool:
         try:
             from twilio.rest import Client
@@ -367,22 +761,6 @@ class NotificationService:
 
         return self.send_sms_notification(phone_number, message)
 
-    def notify_alert(
-        self, alert: Alert, user: User, channels: List[str] = ["push", "email"]
-    ) -> Dict[str, bool]:
-        results = {}
-
-        if "email" in channels:
-            results["email"] = self.send_alert_email(alert, user)
-
-        if "push" in channels:
-            results["push"] = self.send_alert_push(alert, user.id)
-
-        if "sms" in channels:
-            results["sms"] = self.send_alert_sms(alert, user)
-
-        return results
-
     def notify_expiry_batch(self, fridge_id: int, user: User) -> bool:
         from datetime import date, timedelta
 
@@ -390,6 +768,7 @@ class NotificationService:
 
         expiring_items = (
             self.db.query(InventoryItem)
+            .options(selectinload(InventoryItem.product).load_only(Product.name))
             .filter(
                 InventoryItem.fridge_id == fridge_id,
                 InventoryItem.quantity > 0,
@@ -498,14 +877,7 @@ class NotificationService:
                 logger.warning(f"Fridge {fridge_id} not found or no user")
                 return False
 
-            title_map = {
-                "added": "Produit ajouté",
-                "updated": "Produit modifié",
-                "consumed": "Produit consommé",
-                "removed": "Produit retiré",
-            }
-
-            title = title_map.get(action, "Inventaire mis à jour")
+            title = INVENTORY_PUSH_TITLES.get(action, "Inventaire mis à jour")
 
             if quantity and unit:
                 body = f"{product_name} : {quantity} {unit}"
@@ -15,6 +15,7 @@ from app.core.config import settings
 from app.models.product import Product
 from app.models.inventory import InventoryItem
 from app.models.event import Event
+from app.services.event_service import EventService
 from app.schemas.vision import (
     DetectedProduct,
     DetectedProductMatch,
@@ -337,12 +338,14 @@ class VisionService:
         needs_manual_entry = []
 
         notification_products = []
+        events: List[Dict[str, Any]] = []
 
         for detected in detected_products:
             result = self._process_detected_product(
                 detected=detected,
                 fridge_id=fridge_id,
                 send_notification=False,
+                events=events,
             )
 
             if result["action"] == "added":
@@ -365,34 +368,33 @@ class VisionService:
                 }
             )
 
-        from app.models.event import Event
-
-        event = Event(
-            fridge_id=fridge_id,
-            type="ITEM_DETECTED",
-            payload={
-                "source": "vision_scan",
-                "timestamp": datetime.utcnow().isoformat(),
-                "items_added": len(items_added),
-                "items_updated": len(items_updated),
-                "total_detected": len(detected_products),
-            },
+        events.append(
+            {
+                "fridge_id": fridge_id,
+                "event_type": "ITEM_DETECTED",
+                "payload": {
+                    "source": "vision_scan",
+                    "timestamp": datetime.utcnow().isoformat(),
+                    "items_added": len(items_added),
+                    "items_updated": len(items_updated),
+                    "total_detected": len(detected_products),
+                },
+            }
         )
-        self.db.add(event)
+        # Événements de tout le scan en un seul INSERT
+        EventService(self.db).create_events_bulk(events)
 
         if notification_products:
             try:
-                from app.services.notification_service import NotificationService
-
-                notification_service = NotificationService(self.db)
+                from app.tasks.notifications import send_batch_scan_task
 
-                notification_service.send_batch_scan_notification(
+                send_batch_scan_task(
                     fridge_id=fridge_id,
                     scan_type="add",
                     products=notification_products,
                 )
                 logger.info(
-                    f"Sent batch notification for {len(notification_products)} products"
+                    f"Queued batch notification for {len(notification_products)} products"
                 )
             except Exception as e:
                 logger.error(f" Failed to send batch notification: {e}")
@@ -485,6 +487,7 @@ class VisionService:
         detected: DetectedProduct,
         fridge_id: int,
         send_notification: bool = True,
+        events: Optional[List[Dict[str, Any]]] = None,
     ) -> Dict[str, Any]:
         import logging
 
@@ -524,9 +527,7 @@ class VisionService:
         now = datetime.utcnow()
 
         if send_notification:
-            from app.services.notification_service import NotificationService
-
-            notification_service = NotificationService(self.db)
+            from app.tasks.notifications import send_smart_inventory_task
 
         if existing_item:
             existing_item.quantity += detected.count
@@ -556,10 +557,11 @@ class VisionService:
                 logger.error(f"  Error comparing dates: {e}")
                 existing_item.expiry_date = new_expiry
 
-            event = Event(
+            self._record_event(
+                events,
                 fridge_id=fridge_id,
                 inventory_item_id=existing_item.id,
-                type="ITEM_DETECTED",
+                event_type="ITEM_DETECTED",
                 payload={
                     "source": "vision",
                     "added_quantity": detected.count,
@@ -568,11 +570,10 @@ class VisionService:
                     "freshness_status": freshness_status,
                 },
             )
-            self.db.add(event)
 
             if send_notification:
                 try:
-                    notification_service.send_smart_inventory_notification(
+                    send_smart_inventory_task(
                         fridge_id=fridge_id,
                         action="updated",
                         product_name=product.name,
@@ -584,7 +585,7 @@ class VisionService:
                         source="vision",
                     )
                     logger.info(
-                        f"Smart notification sent for vision update: {product.name}"
+                        f"Smart notification queued for vision update: {product.name}"
                     )
                 except Exception as e:
                     logger.error(f"Failed to send vision update notification: {e}")
@@ -612,10 +613,11 @@ class VisionService:
             self.db.add(new_item)
             self.db.flush()
 
-            event = Event(
+            self._record_event(
+                events,
                 fridge_id=fridge_id,
                 inventory_item_id=new_item.id,
-                type="ITEM_ADDED",
+                event_type="ITEM_ADDED",
                 payload={
                     "source": "vision",
                     "product_name": product.name,
@@ -624,11 +626,10 @@ class VisionService:
                     "freshness_status": freshness_status,
                 },
             )
-            self.db.add(event)
 
             if send_notification:
                 try:
-                    notification_service.send_smart_inventory_notification(
+                    send_smart_inventory_task(
                         fridge_id=fridge_id,
                         action="added",
                         product_name=product.name,
@@ -639,7 +640,7 @@ class VisionService:
                         source="vision",
                     )
                     logger.info(
-                        f"Smart notification sent for vision add: {product.name}"
+                        f"Smart notification queued for vision add: {product.name}"
                     )
                 except Exception as e:
                     logger.error(f"Failed to send vision add notification: {e}")
@@ -651,6 +652,34 @@ class VisionService:
                 "freshness_status": freshness_status,
             }
 
+    def _record_event(
+        self,
+        events: Optional[List[Dict[str, Any]]],
+        fridge_id: int,
+        event_type: str,
+        payload: Dict[str, Any],
+        inventory_item_id: Optional[int] = None,
+    ) -> None:
+        # Collecté pour un INSERT groupé quand l'appelant fournit une liste
+        if events is not None:
+            events.append(
+                {
+                    "fridge_id": fridge_id,
+                    "inventory_item_id": inventory_item_id,
+                    "event_type": event_type,
+                    "payload": payload,
+                }
+            )
+        else:
+            self.db.add(
+                Event(
+                    fridge_id=fridge_id,
+                    inventory_item_id=inventory_item_id,
+                    type=event_type,
+                    payload=payload,
+                )
+            )
+
     def _estimate_shelf_life(self, product_name: str, category: str) -> int:
         product_lower = product_name.lower()
         category_lower = category.lower()
@@ -11,6 +11,15 @@ from app.tasks.alert_checker import (
     cleanup_old_data,
     check_lost_items_only,
 )
+from app.tasks.kiosk_tasks import expire_pairing_codes, flush_kiosk_heartbeats
+from app.tasks.notifications import (
+    dispatch_notification,
+    send_alert_notifications_task,
+    send_batch_scan_task,
+    send_email_batch_task,
+    send_smart_inventory_task,
+    shutdown_notification_workers,
+)
 
 __all__ = [
     "start_scheduler",
@@ -22,4 +31,12 @@ __all__ = [
     "send_daily_summaries",
     "cleanup_old_data",
     "check_lost_items_only",
+    "flush_kiosk_heartbeats",
+    "expire_pairing_codes",
+    "dispatch_notification",
+    "send_alert_notifications_task",
+    "send_batch_scan_task",
+    "send_email_batch_task",
+    "send_smart_inventory_task",
+    "shutdown_notification_workers",
 ]
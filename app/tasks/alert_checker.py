@@ -1,6 +1,11 @@
-from app.core.database import SessionLocal
+from collections import defaultdict
+
+from sqlalchemy.orm import joinedload
+
+from app.core.database import BackgroundSessionLocal
 from app.services.alert_service import AlertService
 from app.services.notification_service import NotificationService
+from app.tasks.notifications import send_email_batch_task
 from app.models.fridge import Fridge
 import logging
 
@@ -10,7 +15,7 @@ logger = logging.getLogger(__name__)
 def check_all_alerts():
     logger.info("Starting alert check task...")
 
-    db = SessionLocal()
+    db = BackgroundSessionLocal()
     try:
         alert_service = AlertService(db)
 
@@ -39,7 +44,7 @@ def check_all_alerts():
 def check_fridge_alerts(fridge_id: int):
     logger.info(f"Checking alerts for fridge {fridge_id}...")
 
-    db = SessionLocal()
+    db = BackgroundSessionLocal()
     try:
         alert_service = AlertService(db)
 
@@ -60,34 +65,44 @@ def check_fridge_alerts(fridge_id: int):
 def send_daily_summaries():
     logger.info("📧 Starting daily summary email task...")
 
-    db = SessionLocal()
+    db = BackgroundSessionLocal()
     try:
         notification_service = NotificationService(db)
 
-        fridges = db.query(Fridge).all()
+        fridges = (
+            db.query(Fridge)
+            .options(joinedload(Fridge.user))
+            .filter(Fridge.user_id.isnot(None))
+            .all()
+        )
+        # Compteurs et alertes de tous les frigos en deux requêtes
+        summaries = notification_service.get_daily_summaries(
+            [fridge.id for fridge in fridges]
+        )
 
-        sent_count = 0
-        failed_count = 0
+        messages = []
+        pushes_by_user = defaultdict(list)
+        skipped_count = 0
 
         for fridge in fridges:
-            user = fridge.owner
-
-            if not user:
+            summary = summaries.get(fridge.id)
+            if summary is None:
+                skipped_count += 1
                 continue
 
-            try:
-                success = notification_service.send_daily_summary_email(
-                    user=user, fridge_id=fridge.id
-                )
+            messages.append(
+                notification_service.build_daily_summary_email(fridge.user, summary)
+            )
+            pushes_by_user[fridge.user_id].append(
+                notification_service.build_daily_summary_push(fridge.id, summary)
+            )
 
-                if success:
-                    sent_count += 1
-                else:
-                    failed_count += 1
+        # Appareils de tous les utilisateurs chargés en une requête
+        notification_service.send_push_bulk(pushes_by_user)
 
-            except Exception as e:
-                logger.error(f"Failed to send daily summary for user {user.id}: {e}")
-                failed_count += 1
+        # Un seul lot SMTP ; les messages non tentés sont reprogrammés
+        sent_count = send_email_batch_task(messages)
+        failed_count = len(messages) - sent_count + skipped_count
 
         logger.info(
             f"Daily summaries sent. Success: {sent_count}, Failed: {failed_count}"
@@ -105,7 +120,7 @@ def send_daily_summaries():
 def cleanup_old_data():
     logger.info("Starting data cleanup task...")
 
-    db = SessionLocal()
+    db = BackgroundSessionLocal()
     try:
         from app.services.alert_service import AlertService
         from app.services.event_service import EventService
@@ -135,7 +150,7 @@ def cleanup_old_data():
 def check_lost_items_only():
     logger.info("Checking for lost items only...")
 
-    db = SessionLocal()
+    db = BackgroundSessionLocal()
     try:
         from app.models.inventory import InventoryItem
         from app.models.fridge import Fridge
@@ -0,0 +1,40 @@
+from app.core.database import BackgroundSessionLocal
+from app.services.fridge_service import FridgeService
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def flush_kiosk_heartbeats():
+    db = BackgroundSessionLocal()
+    try:
+        fridge_service = FridgeService(db)
+
+        updated = fridge_service.flush_heartbeats()
+
+        logger.debug(f"Flushed {updated} kiosk heartbeats")
+        return updated
+
+    except Exception as e:
+        logger.error(f"Error flushing kiosk heartbeats: {e}", exc_info=True)
+        raise
+    finally:
+        db.close()
+
+
+def expire_pairing_codes():
+    db = BackgroundSessionLocal()
+    try:
+        fridge_service = FridgeService(db)
+
+        expired = fridge_service.expire_pairing_codes()
+
+        if expired:
+            logger.info(f"Cleared {expired} expired pairing codes")
+        return expired
+
+    except Exception as e:
+        logger.error(f"Error expiring pairing codes: {e}", exc_info=True)
+        raise
+    finally:
+        db.close()
@@ -0,0 +1,125 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional
+import logging
+
+from apscheduler.triggers.date import DateTrigger
+
+from app.core.database import BackgroundSessionLocal
+from app.services.notification_service import (
+    AlertNotification,
+    EmailMessageTuple,
+    NotificationService,
+)
+
+logger = logging.getLogger(__name__)
+
+# Un pool par canal : un fournisseur lent ne bloque pas les autres
+NOTIFICATION_WORKERS = {"email": 4, "push": 8, "sms": 2}
+
+# Lot abandonné (SMTP en échec) : la fin est renvoyée plus tard
+EMAIL_BATCH_RETRY_DELAY_MINUTES = 15
+EMAIL_BATCH_MAX_ATTEMPTS = 3
+
+_executors = {
+    channel: ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix=f"notify-{channel}"
+    )
+    for channel, workers in NOTIFICATION_WORKERS.items()
+}
+
+
+def _run_notification(method: str, kwargs: Dict[str, Any]) -> bool:
+    db = BackgroundSessionLocal()
+    try:
+        return getattr(NotificationService(db), method)(**kwargs)
+
+    except Exception as e:
+        logger.error(f"Notification {method} failed: {e}", exc_info=True)
+        return False
+    finally:
+        db.close()
+
+
+def dispatch_notification(channel: str, method: str, **kwargs) -> Future:
+    """Exécute NotificationService.<method> hors du thread appelant"""
+    return _executors[channel].submit(_run_notification, method, kwargs)
+
+
+def send_smart_inventory_task(
+    fridge_id: int,
+    action: str,
+    product_name: str,
+    quantity: Optional[float] = None,
+    remaining_quantity: Optional[float] = None,
+    unit: Optional[str] = None,
+    freshness_status: str = "unknown",
+    expiry_date: Optional[date] = None,
+    source: str = "manual",
+) -> Future:
+    return dispatch_notification(
+        "push",
+        "send_smart_inventory_notification",
+        fridge_id=fridge_id,
+        action=action,
+        product_name=product_name,
+        quantity=quantity,
+        remaining_quantity=remaining_quantity,
+        unit=unit,
+        freshness_status=freshness_status,
+        expiry_date=expiry_date,
+        source=source,
+    )
+
+
+def send_batch_scan_task(
+    fridge_id: int, scan_type: str, products: List[Dict[str, Any]]
+) -> Future:
+    return dispatch_notification(
+        "push",
+        "send_batch_scan_notification",
+        fridge_id=fridge_id,
+        scan_type=scan_type,
+        products=products,
+    )
+
+
+def send_alert_notifications_task(outbox: List[AlertNotification]) -> Future:
+    return dispatch_notification("push", "send_alert_notifications", outbox=outbox)
+
+
+def send_email_batch_task(messages: List[EmailMessageTuple], attempt: int = 1) -> int:
+    """Envoie un lot d'emails et reprogramme les messages non tentés"""
+    db = BackgroundSessionLocal()
+    try:
+        sent, unsent = NotificationService(db).send_email_batch(messages)
+    finally:
+        db.close()
+
+    if not unsent:
+        return sent
+
+    if attempt >= EMAIL_BATCH_MAX_ATTEMPTS:
+        logger.error(
+            f"Dropping {len(unsent)} emails after {attempt} aborted batch attempts"
+        )
+        return sent
+
+    from app.tasks.scheduler import scheduler
+
+    run_date = datetime.now() + timedelta(minutes=EMAIL_BATCH_RETRY_DELAY_MINUTES)
+    scheduler.add_job(
+        send_email_batch_task,
+        trigger=DateTrigger(run_date=run_date),
+        args=[unsent, attempt + 1],
+        name="Retry aborted email batch",
+    )
+    logger.warning(f"Rescheduled {len(unsent)} unsent emails for {run_date}")
+
+    return sent
+
+
+def shutdown_notification_workers():
+    # Laisse partir les notifications déjà en file avant l'arrêt
+    for executor in _executors.values():
+        executor.shutdown(wait=True)
@@ -7,6 +7,7 @@ from app.tasks.alert_checker import (
     cleanup_old_data,
     check_lost_items_only,
 )
+from app.tasks.kiosk_tasks import expire_pairing_codes, flush_kiosk_heartbeats
 from app.core.config import settings
 import logging
 
@@ -63,6 +64,27 @@ def start_scheduler():
     )
     logger.info("✓ Scheduled: Lost items check (every 6 hours)")
 
+    scheduler.add_job(
+        expire_pairing_codes,
+        trigger=IntervalTrigger(minutes=2),
+        id="expire_pairing_codes",
+        name="Clear expired kiosk pairing codes",
+        replace_existing=True,
+        max_instances=1,
+    )
+    logger.info("✓ Scheduled: Pairing code expiry (every 2 minutes)")
+
+    if settings.REDIS_URL:
+        scheduler.add_job(
+            flush_kiosk_heartbeats,
+            trigger=IntervalTrigger(seconds=60),
+            id="flush_heartbeats",
+            name="Flush cached kiosk heartbeats",
+            replace_existing=True,
+            max_instances=1,
+        )
+        logger.info("✓ Scheduled: Kiosk heartbeat flush (every 60 seconds)")
+
     scheduler.start()
     logger.info("Scheduler started successfully")
 